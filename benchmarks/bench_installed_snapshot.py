@@ -0,0 +1,76 @@
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import (  # noqa: E402
+    clean_and_split_winget_output,
+    merge_installed_snapshot,
+    parse_winget_export,
+)
+
+NAME_WIDTH = 32
+ID_WIDTH = 30
+
+
+def _fit(text, width):
+    # winget cuts long cells to the column width and marks the cut with an ellipsis.
+    if len(text) >= width:
+        return text[:width - 2] + "… "
+    return text.ljust(width)
+
+
+def synthetic_installed(rows):
+    packages = []
+    for i in range(rows):
+        # Every fourth package has a name and id long enough to be cut off.
+        if i % 4 == 0:
+            name = f"Sample Enterprise Application Suite {i} (x64)"
+            pkgid = f"SampleEnterprisePublisher{i % 500}.ApplicationSuite{i}"
+        else:
+            name = f"Sample App {i}"
+            pkgid = f"Sample{i % 500}.App{i}"
+        packages.append((name, pkgid, f"{i % 7}.{i % 13}.{i}"))
+    table = [
+        "Name".ljust(NAME_WIDTH) + "Id".ljust(ID_WIDTH) + "Version".ljust(14) + "Source\n",
+        "-" * (NAME_WIDTH + ID_WIDTH + 20) + "\n",
+    ]
+    for name, pkgid, version in packages:
+        table.append(_fit(name, NAME_WIDTH) + _fit(pkgid, ID_WIDTH) + version.ljust(14) + "winget\n")
+    export = json.dumps({
+        "Sources": [{
+            "Packages": [{"PackageIdentifier": pkgid, "Version": version} for _, pkgid, version in packages],
+            "SourceDetails": {"Name": "winget"},
+        }]
+    })
+    return packages, table, export
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    packages, table, export = synthetic_installed(rows)
+    expected = {pkgid for _, pkgid, _ in packages}
+
+    table_rows, table_time = timed(lambda: clean_and_split_winget_output(iter(table)))
+    exported, export_time = timed(lambda: parse_winget_export(json.loads(export)))
+    merged, merge_time = timed(lambda: merge_installed_snapshot(exported, table_rows))
+
+    def exact_ids(result):
+        return sum(1 for row in result if row[1] in expected)
+
+    print(f"packages:          {rows}")
+    print(f"table parse:       {table_time * 1000:8.1f} ms  exact ids {exact_ids(table_rows)}/{rows}")
+    print(f"export parse:      {export_time * 1000:8.1f} ms")
+    print(f"export + merge:    {(export_time + merge_time) * 1000:8.1f} ms  exact ids {exact_ids(merged)}/{rows}")
+
+
+if __name__ == "__main__":
+    main()
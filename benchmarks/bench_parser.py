@@ -0,0 +1,62 @@
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import (  # noqa: E402
+    WINGET_UPGRADE_FIELDS,
+    iter_winget_table,
+)
+
+
+def synthetic_upgrade_table(rows):
+    widths = (40, 40, 16, 16)
+    header = "Name".ljust(widths[0]) + "Id".ljust(widths[1]) + "Version".ljust(widths[2]) + "Available".ljust(widths[3]) + "Source"
+    yield "   - \r   \\ \r" + header + "\n"
+    yield "-" * (sum(widths) + 6) + "\n"
+    for i in range(rows):
+        if i % 50 == 0:
+            name = f"应用程序 {i}"
+            pad = widths[0] - len(name) - sum(1 for ch in name if ord(ch) > 0x2E80)
+            name = name + " " * pad
+        else:
+            name = f"Sample App {i} (x64)".ljust(widths[0])
+        yield (
+            name
+            + f"Vendor.SampleApp{i}".ljust(widths[1])
+            + f"1.{i % 10}.{i % 97} beta".ljust(widths[2])
+            + f"2.{i % 10}.0".ljust(widths[3])
+            + "winget\n"
+        )
+    yield f"{rows} upgrades available.\n"
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    lines = list(synthetic_upgrade_table(rows))
+    size = sum(len(line.encode("utf-8")) for line in lines)
+
+    started = time.perf_counter()
+    count = 0
+    for _ in iter_winget_table(iter(lines), WINGET_UPGRADE_FIELDS):
+        count += 1
+    elapsed = time.perf_counter() - started
+
+    # Separate pass: tracemalloc slows the parser down several times over.
+    tracemalloc.start()
+    for _ in iter_winget_table(iter(lines), WINGET_UPGRADE_FIELDS):
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert count == rows, f"parsed {count} of {rows} rows"
+    print(f"rows:       {count}")
+    print(f"elapsed:    {elapsed * 1000:.1f} ms")
+    print(f"throughput: {count / elapsed:,.0f} rows/s ({size / elapsed / 1e6:.1f} MB/s)")
+    print(f"peak mem:   {peak / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Scriptable stand-in for winget used by the benchmark suite.
+
+Output size and timing come from environment variables so the same script can
+play a small catalog on a fast machine or a huge one behind a slow network:
+
+    FAKE_WINGET_ROWS         rows in search/list/upgrade tables (default 2000)
+    FAKE_WINGET_LATENCY      seconds before the first byte (default 0)
+    FAKE_WINGET_LINE_DELAY   seconds between table rows or log lines (default 0)
+    FAKE_WINGET_LOG_LINES    plain log lines in an install/upgrade run (default 200)
+    FAKE_WINGET_PROGRESS     progress bar redraws per download (default 50)
+    FAKE_WINGET_UPGRADE_ALL  packages upgraded by `upgrade --all` (default 5)
+"""
+import json
+import os
+import sys
+import time
+
+ROWS = int(os.environ.get("FAKE_WINGET_ROWS", "2000"))
+LATENCY = float(os.environ.get("FAKE_WINGET_LATENCY", "0"))
+LINE_DELAY = float(os.environ.get("FAKE_WINGET_LINE_DELAY", "0"))
+LOG_LINES = int(os.environ.get("FAKE_WINGET_LOG_LINES", "200"))
+PROGRESS_STEPS = int(os.environ.get("FAKE_WINGET_PROGRESS", "50"))
+UPGRADE_ALL = int(os.environ.get("FAKE_WINGET_UPGRADE_ALL", "5"))
+
+WIDTHS = (40, 40, 16, 16)
+SPINNER = "   - \r   \\ \r   | \r   / \r"
+
+
+def out(text):
+    sys.stdout.write(text)
+    if LINE_DELAY:
+        sys.stdout.flush()
+        time.sleep(LINE_DELAY)
+
+
+def package(i, prefix="Sample"):
+    return f"{prefix} App {i}", f"{prefix}Vendor.App{i}", f"1.{i % 10}.{i % 97}"
+
+
+def table(columns, rows, footer=None):
+    out(SPINNER + "".join(c.ljust(w) for c, w in zip(columns[:-1], WIDTHS)) + columns[-1] + "\n")
+    out("-" * (sum(WIDTHS) + 8) + "\n")
+    for row in rows:
+        out("".join(c.ljust(w) for c, w in zip(row[:-1], WIDTHS)) + row[-1] + "\n")
+    if footer:
+        out(footer + "\n")
+
+
+def search(query):
+    prefix = "".join(ch for ch in query.title() if ch.isalnum()) or "Sample"
+    rows = []
+    for i in range(ROWS):
+        name, pkgid, version = package(i, prefix)
+        rows.append((name, pkgid, version, f"Tag: {query}" if i % 3 == 0 else "", "winget"))
+    table(("Name", "Id", "Version", "Match", "Source"), rows)
+
+
+def installed_rows():
+    for i in range(ROWS):
+        yield package(i) + ("winget",)
+
+
+def upgrade_rows():
+    for i in range(0, ROWS, 4):
+        name, pkgid, version = package(i)
+        yield name, pkgid, version, f"2.{i % 10}.0", "winget"
+
+
+def progress_bar(size_mb):
+    width = 30
+    for step in range(1, PROGRESS_STEPS + 1):
+        filled = width * step // PROGRESS_STEPS
+        done = size_mb * step / PROGRESS_STEPS
+        out(f"  {'█' * filled}{'▒' * (width - filled)}  {done:.1f} MB / {size_mb:.1f} MB\r")
+    out("\n")
+
+
+def install_stream(pkgid, verb="Installing"):
+    out(SPINNER + f"Found {pkgid} [{pkgid}] Version 2.0.0\n")
+    out("This application is licensed to you by its owner.\n")
+    out(f"Downloading https://example.invalid/{pkgid}/setup.exe\n")
+    progress_bar(48.0)
+    out("Successfully verified installer hash\n")
+    out("Starting package install...\n")
+    for i in range(LOG_LINES):
+        out(f"[{pkgid}] {verb.lower()} component {i} of {LOG_LINES}\n")
+    out(f"Successfully {'installed' if verb == 'Installing' else 'upgraded'}\n")
+
+
+def upgrade_all():
+    count = min(UPGRADE_ALL, ROWS)
+    for n, row in enumerate(list(upgrade_rows())[:count], 1):
+        out(f"({n}/{count}) Found {row[0]} [{row[1]}] Version {row[3]}\n")
+        install_stream(row[1], "Upgrading")
+
+
+def show(pkgid):
+    out(SPINNER + f"Found {pkgid} [{pkgid}]\n")
+    out("Version: 2.0.0\nPublisher: Sample Vendor\nAuthor: Sample Vendor\n")
+    out(f"Homepage: https://example.invalid/{pkgid}\nLicense: MIT\n")
+    out("Description:\n  A synthetic package used by the benchmark suite.\n  It has a two line description.\n")
+    out("Tags:\n  sample\n  benchmark\n")
+    out(f"Installer:\n  Installer Type: exe\n  Installer Url: https://example.invalid/{pkgid}/setup.exe\n")
+
+
+def export(path):
+    packages = [{"PackageIdentifier": row[1], "Version": row[2]} for row in installed_rows()]
+    data = {
+        "$schema": "https://aka.ms/winget-packages.schema.2.0.json",
+        "Sources": [{"Packages": packages, "SourceDetails": {"Name": "winget", "Type": "Microsoft.PreIndexed.Package"}}],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def option(args, name):
+    return args[args.index(name) + 1] if name in args else ""
+
+
+def main(args):
+    if LATENCY:
+        time.sleep(LATENCY)
+    command = args[0] if args else ""
+    if command == "search":
+        search(args[1] if len(args) > 1 else "")
+    elif command == "list":
+        table(("Name", "Id", "Version", "Source"), installed_rows())
+    elif command == "upgrade" and "--all" in args:
+        upgrade_all()
+    elif command == "upgrade" and "--id" in args:
+        install_stream(option(args, "--id"), "Upgrading")
+    elif command == "upgrade":
+        rows = list(upgrade_rows())
+        table(("Name", "Id", "Version", "Available", "Source"), rows, f"{len(rows)} upgrades available.")
+    elif command == "install":
+        install_stream(option(args, "--id"))
+    elif command == "uninstall":
+        out(SPINNER + f"Found {option(args, '--id')}\nStarting package uninstall...\n")
+        progress_bar(1.0)
+        out("Successfully uninstalled\n")
+    elif command == "show":
+        show(option(args, "--id"))
+    elif command == "source" and args[1:2] == ["list"]:
+        table(("Name", "Argument", "Type"), [("winget", "https://cdn.winget.microsoft.com/cache", "Microsoft.PreIndexed.Package")])
+    elif command == "source" and args[1:2] == ["update"]:
+        out(SPINNER + f"Updating source: {option(args, '--name') or 'winget'}...\nDone\n")
+    elif command == "export":
+        export(option(args, "-o"))
+    else:
+        out(f"Unrecognized command: {' '.join(args)}\n")
+        return 1
+    sys.stdout.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,236 @@
+"""End-to-end benchmark suite: drives Api against the fake winget in this folder.
+
+    python benchmarks/run_suite.py --rows 5000 --output results.json
+    python benchmarks/run_suite.py --baseline results.json --tolerance 0.25
+
+With --baseline the run exits non-zero when any metric got worse than the
+baseline by more than the tolerance, so CI can fail on regressions.
+"""
+import argparse
+import json
+import os
+import platform
+import stat
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import main  # noqa: E402
+from bench_parser import synthetic_upgrade_table  # noqa: E402
+
+# Metrics where a bigger number is better; everything else (times, sizes, call
+# counts) is compared the other way round.
+HIGHER_IS_BETTER = ("_per_s",)
+# Sub-millisecond timings (cache hits) jitter by more than any sane tolerance.
+MIN_DELTA_MS = 2
+
+
+class CountingWindow:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.bytes = 0
+
+    def evaluate_js(self, script):
+        name = script.split("(", 1)[0]
+        with self.lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+            self.bytes += len(script)
+
+    def total(self):
+        with self.lock:
+            return sum(self.calls.values())
+
+
+def install_fake_winget(bin_dir):
+    fake = os.path.join(HERE, "fake_winget.py")
+    if main.IS_WINDOWS:
+        path = os.path.join(bin_dir, "winget.cmd")
+        with open(path, "w") as f:
+            f.write(f'@"{sys.executable}" "{fake}" %*\n')
+    else:
+        path = os.path.join(bin_dir, "winget")
+        with open(path, "w") as f:
+            f.write(f'#!/bin/sh\nexec "{sys.executable}" "{fake}" "$@"\n')
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+    os.environ["PATH"] = bin_dir + os.pathsep + os.environ.get("PATH", "")
+
+
+def timed(call):
+    started = time.perf_counter()
+    value = call()
+    return value, (time.perf_counter() - started) * 1000
+
+
+def bench_parser(rows):
+    lines = list(synthetic_upgrade_table(rows))
+    count, elapsed = timed(lambda: sum(1 for _ in main.iter_winget_table(iter(lines), main.WINGET_UPGRADE_FIELDS)))
+    tracemalloc.start()
+    for _ in main.iter_winget_table(iter(lines), main.WINGET_UPGRADE_FIELDS):
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert count == rows, f"parsed {count} of {rows} rows"
+    return {
+        "parser_rows_per_s": round(count / (elapsed / 1000)),
+        "parser_peak_kib": round(peak / 1024),
+    }
+
+
+def bench_calls(api, rows):
+    results = {}
+    calls = [
+        ("search_cold_ms", lambda: api.winget_search("sample", force=True)),
+        ("search_cached_ms", lambda: api.winget_search("sample")),
+        ("list_cold_ms", lambda: api.winget_list_installed(force=True)),
+        ("list_cached_ms", lambda: api.winget_list_installed()),
+        ("upgrade_list_cold_ms", lambda: api.winget_upgrade_list(force=True)),
+        ("show_cold_ms", lambda: api.winget_show("SampleVendor.App1")),
+        ("show_cached_ms", lambda: api.winget_show("SampleVendor.App1")),
+    ]
+    for name, call in calls:
+        payload, elapsed = timed(call)
+        results[name] = round(elapsed, 2)
+        results[name.replace("_ms", "_payload_bytes")] = len(payload)
+    listed = json.loads(api.winget_list_installed())
+    assert len(listed) == rows, f"listed {len(listed)} of {rows} packages"
+
+    api.set_setting("installed_backend", "export")
+    _, elapsed = timed(lambda: api.winget_list_installed(force=True))
+    results["list_export_ms"] = round(elapsed, 2)
+    api.set_setting("installed_backend", "table")
+    return results
+
+
+def wait_for(api, task_ids, timeout=300):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if all(api.tasks[t]["status"] in ("success", "error", "cancelled") for t in task_ids):
+            return
+        time.sleep(0.01)
+    raise TimeoutError(f"tasks did not finish: {task_ids}")
+
+
+def bench_tasks(api, window, installs):
+    before = window.total()
+    started = time.perf_counter()
+    task_ids = [api.winget_install(f"SampleVendor.App{i}") for i in range(installs)]
+    wait_for(api, task_ids)
+    elapsed = time.perf_counter() - started
+    api._pump.flush()
+    lines = sum(len(api.tasks[t]["log"]) for t in task_ids)
+    failed = [t for t in task_ids if api.tasks[t]["status"] != "success"]
+    assert not failed, f"{len(failed)} install tasks failed"
+
+    batch = api.winget_upgrade_all()
+    wait_for(api, [batch])
+    api._pump.flush()
+    return {
+        "task_lines": lines,
+        "collect_output_lines_per_s": round(lines / elapsed),
+        "task_evaluate_js_calls": window.total() - before,
+    }
+
+
+def max_rss_kib():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def run(args):
+    os.environ["FAKE_WINGET_ROWS"] = str(args.rows)
+    os.environ["FAKE_WINGET_LATENCY"] = str(args.latency)
+    os.environ["FAKE_WINGET_LOG_LINES"] = str(args.log_lines)
+    results = bench_parser(args.parser_rows)
+    with tempfile.TemporaryDirectory(prefix="winget-bench-") as tmp:
+        install_fake_winget(tmp)
+        window = CountingWindow()
+        api = main.Api(data_dir=os.path.join(tmp, "data"))
+        api.set_window(window)
+        results.update(bench_calls(api, args.rows))
+        results.update(bench_tasks(api, window, args.installs))
+        api._pump.flush()
+        results["evaluate_js_calls"] = window.total()
+        results["evaluate_js_bytes"] = window.bytes
+        results.update({f"pump_{k}": v for k, v in api.get_event_stats().items()})
+    rss = max_rss_kib()
+    if rss is not None:
+        results["max_rss_kib"] = rss
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "rows": args.rows,
+            "parser_rows": args.parser_rows,
+            "installs": args.installs,
+            "log_lines": args.log_lines,
+            "latency": args.latency,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "results": results,
+    }
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, old in baseline.items():
+        new = results.get(name)
+        if not isinstance(old, (int, float)) or not isinstance(new, (int, float)) or not old:
+            continue
+        if name.endswith("_ms") and abs(new - old) < MIN_DELTA_MS:
+            continue
+        change = (new - old) / old
+        if name.endswith(HIGHER_IS_BETTER):
+            change = -change
+        if change > tolerance:
+            regressions.append(f"{name}: {old} -> {new} ({change:+.0%})")
+    return regressions
+
+
+def cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000, help="rows in fake search/list output")
+    parser.add_argument("--parser-rows", type=int, default=50000, help="rows in the parser throughput table")
+    parser.add_argument("--installs", type=int, default=8, help="install tasks to stream")
+    parser.add_argument("--log-lines", type=int, default=2000, help="log lines per install")
+    parser.add_argument("--latency", type=float, default=0, help="fake winget start-up delay in seconds")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="compare against a previous results JSON")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for key in ("rows", "parser_rows", "installs", "log_lines", "latency"):
+            if baseline["meta"].get(key) != report["meta"][key]:
+                print(f"warning: baseline was run with {key}={baseline['meta'].get(key)}", file=sys.stderr)
+        regressions = compare(report["results"], baseline["results"], args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(cli())
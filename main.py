@@ -1,68 +1,294 @@
-import webview
 import subprocess
 import threading
 import signal
 import time
 import json
+import os
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict, deque
+import re
+import heapq
+import itertools
+import unicodedata
+import tempfile
+import codecs
+import csv
+import locale
+import mmap
+import sqlite3
+from array import array
+import argparse
+import secrets
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 
-def clean_and_split_winget_output(lines):
-    cleaned_lines = []
-    header_found = False
+WINGET_TABLE_FIELDS = ("Name", "Id", "Version", "Source")
+WINGET_SEARCH_FIELDS = ("Name", "Id", "Version", "Source", "Match")
+WINGET_UPGRADE_FIELDS = ("Name", "Id", "Version", "Available", "Source")
+WINGET_SOURCE_FIELDS = ("Name", "Argument", "Type")
+
+
+# East Asian wide and fullwidth ranges; anything else takes one terminal cell.
+_WIDE_CHARS = re.compile(
+    "[\u1100-\u115f\u2e80-\u303e\u3041-\u33ff\u3400-\u4dbf\u4e00-\u9fff\ua000-\ua4cf"
+    "\uac00-\ud7a3\uf900-\ufaff\ufe30-\ufe4f\uff00-\uff60\uffe0-\uffe6"
+    "\U0001f300-\U0001f64f\U0001f900-\U0001f9ff\U00020000-\U0003fffd]"
+)
+
+
+def _display_width(ch):
+    return 2 if unicodedata.east_asian_width(ch) in "WF" else 1
+
+
+def _column_starts(header):
+    # Header titles are measured in terminal cells, the same unit winget pads rows with.
+    if header.isascii():
+        return [m.start() for m in re.finditer(r"\S+", header)]
+    starts = []
+    col = 0
+    prev_space = True
+    for ch in header:
+        if prev_space and not ch.isspace():
+            starts.append(col)
+        prev_space = ch.isspace()
+        col += _display_width(ch)
+    return starts
+
+
+def _char_offsets(line, starts):
+    if line.isascii() or not _WIDE_CHARS.search(line):
+        return starts
+    offsets = []
+    targets = iter(starts)
+    target = next(targets, None)
+    col = 0
+    for idx, ch in enumerate(line):
+        while target is not None and col >= target:
+            offsets.append(idx)
+            target = next(targets, None)
+        if target is None:
+            break
+        col += _display_width(ch)
+    while target is not None:
+        offsets.append(len(line))
+        target = next(targets, None)
+    return offsets
+
+
+def _is_rule(line):
+    return line.startswith("-") and not line.rstrip().strip("-")
+
+
+def iter_winget_table(lines, fields=WINGET_TABLE_FIELDS):
+    """Yield one list of ``fields`` per row of the tables winget prints.
+
+    Column offsets come from the header line above each dash rule, so rows are
+    sliced as they arrive instead of being re-split on whitespace.
+    """
+    starts = None
+    picks = None
+    titles = None
+    pending = None
     for line in lines:
-        stripped = line.strip()
-        if not stripped or set(stripped) <= {'-'}:
+        line = line.rstrip("\r\n")
+        if "\r" in line:
+            line = line.rsplit("\r", 1)[1]
+        if _is_rule(line):
+            if pending is not None:
+                header_starts = _column_starts(pending)
+                if header_starts and len(line.rstrip()) >= header_starts[-1]:
+                    titles = pending.split()
+                    starts = header_starts
+                    picks = [titles.index(f) if f in titles else None for f in fields]
+                    pending = None
             continue
-        if stripped.startswith('Name') and 'Id' in stripped and 'Version' in stripped and 'Source' in stripped:
-            header_found = True
+        if pending is not None and starts is not None:
+            row = _slice_row(pending, starts, picks)
+            if row is not None:
+                yield row
+        pending = None
+        if not line.strip():
+            starts = None
             continue
-        if not header_found:
+        if starts is None or (line.startswith(titles[0]) and titles[-1] in line):
+            # Only a line that could be a header waits for the next one; rows
+            # are yielded as soon as they arrive.
+            pending = line
             continue
-        cleaned_lines.append(line.strip())
-    results = []
-    for line in cleaned_lines:
-        parts = line.split()
-        if len(parts) <= 4:
-            results.append(parts)
-        else:
-            name = ' '.join(parts[:-3])
-            rest = parts[-3:]
-            results.append([name] + rest)
-    return results
+        row = _slice_row(line, starts, picks)
+        if row is not None:
+            yield row
+    if pending is not None and starts is not None:
+        row = _slice_row(pending, starts, picks)
+        if row is not None:
+            yield row
+
+
+def _slice_row(line, starts, picks):
+    offsets = _char_offsets(line, starts)
+    size = len(line)
+    for off in offsets[1:]:
+        if off >= size:
+            break
+        if line[off - 1] != " ":
+            # Text running across a column boundary is a footer, not a row.
+            return None
+    last = len(offsets) - 1
+    if last and not line[offsets[1]:offsets[2] if last > 1 else size].strip():
+        return None
+    return [
+        line[offsets[p]:offsets[p + 1] if p < last else size].strip() if p is not None else ""
+        for p in picks
+    ]
+
+
+def clean_and_split_winget_output(lines):
+    return list(iter_winget_table(lines, WINGET_TABLE_FIELDS))
 
 
 def clean_and_split_winget_upgrade_output(lines):
-    cleaned_lines = []
-    header_found = False
-    for line in lines:
-        stripped = line.strip()
-        if not stripped or set(stripped) <= {'-'}:
+    return list(iter_winget_table(lines, WINGET_UPGRADE_FIELDS))
+
+
+def clean_and_split_winget_source_output(lines):
+    return [
+        {"Name": name, "Arg": arg, "Type": typ}
+        for name, arg, typ in iter_winget_table(lines, WINGET_SOURCE_FIELDS)
+    ]
+
+
+def parse_winget_export(data):
+    rows = []
+    for source in data.get("Sources", []):
+        source_name = source.get("SourceDetails", {}).get("Name", "")
+        for pkg in source.get("Packages", []):
+            rows.append([pkg.get("PackageIdentifier", ""), pkg.get("Version", ""), source_name])
+    return rows
+
+
+def merge_installed_snapshot(exported, table_rows):
+    # The export has exact ids and versions but no names, and it leaves out
+    # packages that no source knows about; the table fills in both.
+    by_id = {}
+    truncated = {}
+    for row in table_rows:
+        if row[1].endswith("\u2026"):
+            prefix = row[1][:-1]
+            group = truncated.setdefault(len(prefix), {}).setdefault(prefix, ({}, deque()))
+            group[0].setdefault(row[2], deque()).append(row)
+            group[1].append(row)
+        else:
+            by_id[row[1]] = row
+    used = set()
+    merged = []
+    for pkgid, version, source in exported:
+        row = by_id.get(pkgid)
+        if row is None:
+            row = _match_truncated(pkgid, version, truncated, used)
+        if row is not None:
+            used.add(id(row))
+            merged.append([row[0], pkgid, version or row[2], source or row[3]])
+        else:
+            merged.append([pkgid, pkgid, version, source])
+    merged.extend(row for row in table_rows if id(row) not in used)
+    return merged
+
+
+def _match_truncated(pkgid, version, truncated, used):
+    # Several ids can share a truncated prefix; the version column tells them apart.
+    for length, groups in truncated.items():
+        group = groups.get(pkgid[:length])
+        if group is None:
             continue
-        if stripped.startswith('Name') and 'Id' in stripped and 'Version' in stripped and 'Available' in stripped and 'Source' in stripped:
-            header_found = True
+        for candidates in (group[0].get(version), group[1]):
+            while candidates:
+                row = candidates.popleft()
+                if id(row) not in used:
+                    return row
+    return None
+
+
+_VERSION_PART = re.compile(r"(\d*)(.*)")
+
+
+def parse_version(text):
+    # Mirrors winget's own ordering: dot-separated parts, each a leading number
+    # plus an optional tail, where a bare number sorts after the same number
+    # with a tail ("1.0" > "1.0-beta") and trailing zero parts do not count.
+    text = text.strip().lstrip("<> ").strip()
+    if not text or text.lower() == "unknown":
+        return None
+    if text[0] in "vV" and text[1:2].isdigit():
+        text = text[1:]
+    parts = []
+    for piece in text.split("."):
+        number, tail = _VERSION_PART.match(piece.strip()).groups()
+        parts.append((int(number) if number else 0, tail.lower()))
+    while len(parts) > 1 and parts[-1] == (0, ""):
+        parts.pop()
+    return parts
+
+
+def compare_versions(a, b):
+    left, right = parse_version(a), parse_version(b)
+    if left is None or right is None:
+        return None
+    width = max(len(left), len(right))
+    for (ln, lt), (rn, rt) in zip(left + [(0, "")] * (width - len(left)), right + [(0, "")] * (width - len(right))):
+        if ln != rn:
+            return -1 if ln < rn else 1
+        if lt != rt:
+            if not lt or not rt:
+                return 1 if not lt else -1
+            return -1 if lt < rt else 1
+    return 0
+
+
+def upgradable(row):
+    # winget only offers upgrades for packages it can tie to a source and a
+    # comparable version; ARP entries and "Unknown" versions never qualify.
+    return bool(row[3]) and parse_version(row[2]) is not None
+
+
+def catalog_entry(catalog, pkgid):
+    if not pkgid.endswith("\u2026"):
+        return (pkgid, catalog[pkgid]) if pkgid in catalog else None
+    # Tables cut long ids to "Prefix…", and not always at the same length;
+    # accept the catalog id only when the prefix picks exactly one.
+    prefix = pkgid[:-1]
+    matches = [(key, version) for key, version in catalog.items() if key.startswith(prefix)]
+    return matches[0] if len(matches) == 1 else None
+
+
+def compute_upgrades(installed, catalog):
+    upgrades = []
+    for row in installed:
+        if not upgradable(row):
             continue
-        if not header_found:
+        name, _, version, source = row[:4]
+        entry = catalog_entry(catalog, row[1])
+        if entry is None:
             continue
-        cleaned_lines.append(line.strip())
-    results = []
-    for line in cleaned_lines:
-        parts = line.split()
-        if len(parts) <= 5:
-            results.append(parts)
-        else:
-            name = ' '.join(parts[:-4])
-            rest = parts[-4:]
-            results.append([name] + rest)
-    print(results)
-    return results
+        pkgid, available = entry
+        order = compare_versions(available, version)
+        # "< 2.0" means winget only knows the install predates 2.0.
+        if order == 1 or (order == 0 and version.startswith("<")):
+            upgrades.append([name, pkgid, version, available, source])
+    return upgrades
 
 
-def parse_winget_show_output(text):
+def parse_winget_show_output(lines):
+    if isinstance(lines, str):
+        lines = [lines]
     info = {}
     current_key = None
     current_value_lines = []
-    for line in text.splitlines():
+    # Lines are consumed as winget prints them; splitlines also drops the
+    # spinner frames that share a line with the first field.
+    for line in (part for chunk in lines for part in chunk.splitlines()):
         if not line.strip():
             continue
         if ':' in line:
@@ -78,14 +304,1221 @@ def parse_winget_show_output(text):
     return info
 
 
+IS_WINDOWS = os.name == "nt"
+
+COMMAND_TIMEOUTS = {
+    "search": 60,
+    "list": 120,
+    "upgrade": 180,
+    "show": 60,
+    "source": 120,
+}
+
+
+CANCEL_GRACE_SECONDS = 6
+SEARCH_BATCH_SECONDS = 0.1
+
+
+METRICS_SAMPLES = 256
+METRICS_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Metrics:
+    def __init__(self, path=None, samples=METRICS_SAMPLES):
+        self.path = path
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._totals = {}
+        self._counters = {}
+        self._max_samples = samples
+
+    def record(self, op, **fields):
+        sample = dict(fields, op=op, at=round(time.time(), 3))
+        with self._lock:
+            self._samples.setdefault(op, deque(maxlen=self._max_samples)).append(sample)
+            self._totals[op] = self._totals.get(op, 0) + 1
+            path = self.path
+        if path:
+            try:
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(sample) + "\n")
+            except OSError as e:
+                print(f"Failed to write metrics {path}: {e}")
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def summary(self):
+        with self._lock:
+            samples = {op: list(values) for op, values in self._samples.items()}
+            totals = dict(self._totals)
+            counters = dict(self._counters)
+        ops = {}
+        for op, values in samples.items():
+            fields = {}
+            for name in values[-1]:
+                series = sorted(v[name] for v in values if isinstance(v.get(name), (int, float)) and name != "at")
+                if series:
+                    fields[name] = {
+                        "p50": series[len(series) // 2],
+                        "p95": series[min(len(series) - 1, len(series) * 95 // 100)],
+                        "max": series[-1],
+                        "last": values[-1].get(name),
+                    }
+            histogram = [0] * (len(METRICS_BUCKETS_MS) + 1)
+            for v in values:
+                if "total_ms" in v:
+                    histogram[sum(1 for edge in METRICS_BUCKETS_MS if v["total_ms"] > edge)] += 1
+            ops[op] = {"count": totals[op], "fields": fields, "histogram": histogram}
+        return {"ops": ops, "counters": counters, "buckets_ms": list(METRICS_BUCKETS_MS)}
+
+
+class CommandTimeout(Exception):
+    pass
+
+
+class CommandCancelled(Exception):
+    pass
+
+
+class CommandFailed(Exception):
+    pass
+
+
+def _popen_options():
+    # winget is an app execution alias on Windows; running it through the shell
+    # resolves it the same way a terminal does.
+    if IS_WINDOWS:
+        return {"shell": True, "creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+def _kill_process_tree(proc):
+    if proc.poll() is not None:
+        return
+    try:
+        if IS_WINDOWS:
+            # With shell=True, proc is cmd.exe; /T takes winget down with it.
+            subprocess.run(["taskkill", "/T", "/F", "/PID", str(proc.pid)], capture_output=True)
+        else:
+            os.killpg(proc.pid, signal.SIGKILL)
+    except OSError as e:
+        print(f"Failed to kill process {proc.pid}: {e}")
+
+
+class CommandRunner:
+    def __init__(self, max_workers=4, metrics=None):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="winget")
+        self._lock = threading.Lock()
+        self._procs = {}
+        self._cancelled = set()
+        self._metrics = metrics
+        self._active = 0
+
+    def active(self):
+        with self._lock:
+            return self._active
+
+    def stream(self, args, timeout=None, key=None, superseded=None, check=False):
+        started = time.perf_counter()
+        proc = subprocess.Popen(
+            ["winget"] + args,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            errors="replace",
+            **_popen_options(),
+        )
+        spawned = time.perf_counter()
+        with self._lock:
+            self._active += 1
+            if key is not None:
+                self._procs[key] = proc
+            # A cancel that raced the spawn found nothing to kill; the caller's
+            # check catches it now that the process is registered.
+            if superseded is not None and superseded():
+                self._cancelled.add(proc.pid)
+                _kill_process_tree(proc)
+        timed_out = threading.Event()
+
+        def expire():
+            timed_out.set()
+            _kill_process_tree(proc)
+
+        timer = threading.Timer(timeout, expire) if timeout else None
+        if timer:
+            timer.daemon = True
+            timer.start()
+        finished = False
+        first_byte = None
+        waited = 0.0
+        size = 0
+        lines = 0
+        try:
+            while True:
+                before = time.perf_counter()
+                line = proc.stdout.readline()
+                waited += time.perf_counter() - before
+                if not line:
+                    break
+                if first_byte is None:
+                    first_byte = time.perf_counter()
+                size += len(line.encode("utf-8", "replace"))
+                lines += 1
+                yield line
+            finished = True
+        finally:
+            if timer:
+                timer.cancel()
+            if not finished:
+                _kill_process_tree(proc)
+            proc.stdout.close()
+            proc.wait()
+            failed = check and proc.returncode != 0
+            cancelled = False
+            with self._lock:
+                self._active -= 1
+            if key is not None:
+                with self._lock:
+                    if self._procs.get(key) is proc:
+                        del self._procs[key]
+                    cancelled = proc.pid in self._cancelled
+                    self._cancelled.discard(proc.pid)
+            if self._metrics:
+                total = time.perf_counter() - started
+                # Whatever the consumer spent between reads is parsing.
+                self._metrics.record(
+                    f"winget.{args[0]}",
+                    spawn_ms=round((spawned - started) * 1000, 2),
+                    ttfb_ms=round((first_byte - started) * 1000, 2) if first_byte else None,
+                    total_ms=round(total * 1000, 2),
+                    parse_ms=round(max(0.0, total - waited - (spawned - started)) * 1000, 2),
+                    bytes=size,
+                    lines=lines,
+                    status="cancelled" if cancelled else "timeout" if timed_out.is_set() else "failed" if failed else "ok",
+                )
+        if cancelled:
+            raise CommandCancelled(f"winget {args[0]} was cancelled")
+        if timed_out.is_set():
+            raise CommandTimeout(f"winget {args[0]} timed out after {timeout}s")
+        if failed:
+            raise CommandFailed(f"winget {args[0]} exited with code {proc.returncode}")
+
+    def submit(self, args, parse, timeout=None, key=None, check=False):
+        return self._pool.submit(lambda: parse(self.stream(args, timeout, key, check=check)))
+
+    def run(self, args, parse, timeout=None, key=None, check=False):
+        return self.submit(args, parse, timeout, key, check).result()
+
+    def cancel(self, key):
+        with self._lock:
+            proc = self._procs.get(key)
+            if proc is None:
+                return False
+            self._cancelled.add(proc.pid)
+        _kill_process_tree(proc)
+        return True
+
+
+CACHE_TTLS = {
+    "search": 60 * 60,
+    "list": 5 * 60,
+    "upgrade": 15 * 60,
+    "source": 60 * 60,
+    "names": 7 * 24 * 60 * 60,
+    "catalog": 7 * 24 * 60 * 60,
+    "show": 24 * 60 * 60,
+}
+
+# Past their TTL these are still shown at startup (marked stale) while a fresh
+# copy is fetched; everything else is dropped once it expires.
+STALE_COMMANDS = ("list", "upgrade", "source")
+STALE_MAX_AGE = 30 * 24 * 60 * 60
+TASK_HISTORY = 100
+
+INSTALLED_BACKENDS = ("table", "export")
+
+DEFAULT_SETTINGS = {
+    "installed_backend": "table",
+    "metrics_file": "",
+}
+
+RECONCILE_DELAY_SECONDS = 3
+
+TASK_LOG_TAIL = 200
+TASK_LOG_FLUSH_BYTES = 64 * 1024
+TASK_LOG_PAGE = 500
+TASK_LOG_RETENTION = 7 * 24 * 60 * 60
+UPGRADE_VERIFY_INTERVAL = 30 * 60
+
+# winget refreshes a source itself when it is older than its auto-update interval
+# (15 minutes by default) and makes whichever query noticed it wait; refreshing
+# more often than that in the background keeps that cost off interactive calls.
+SOURCE_REFRESH_INTERVAL = 10 * 60
+SOURCE_REFRESH_TICK = 30
+SOURCE_REFRESH_BACKOFF = (60, 60 * 60)
+
+BULK_SHOW_WORKERS = 6
+BULK_SHOW_MAX_WORKERS = 16
+BULK_SHOW_KEEP = 4
+
+DAEMON_HOST = "127.0.0.1"
+DAEMON_PORT = 8765
+DAEMON_EVENT_BACKLOG = 5000
+DAEMON_HEARTBEAT_SECONDS = 15
+
+
+def _app_data_dir():
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "winget-ui")
+
+
+class StateStore:
+    # Everything that should survive a restart lives in one SQLite file: cached
+    # winget results and the history of finished tasks.
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, stored_at REAL NOT NULL, value TEXT NOT NULL)")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS tasks (id TEXT PRIMARY KEY, parent TEXT, kind TEXT, pkgid TEXT,"
+                " status TEXT, message TEXT, finished_at REAL)"
+            )
+            self._db = db
+        except sqlite3.Error as e:
+            print(f"Failed to open state store {path}: {e}")
+
+    def _query(self, sql, params=()):
+        if self._db is None:
+            return []
+        with self._lock:
+            try:
+                return self._db.execute(sql, params).fetchall()
+            except sqlite3.Error as e:
+                print(f"State store query failed: {e}")
+                return []
+
+    def _write(self, sql, rows):
+        if self._db is None or not rows:
+            return
+        with self._lock:
+            try:
+                self._db.execute("BEGIN")
+                self._db.executemany(sql, rows)
+                self._db.execute("COMMIT")
+            except sqlite3.Error as e:
+                print(f"State store write failed: {e}")
+                if self._db.in_transaction:
+                    self._db.execute("ROLLBACK")
+
+    def cache_rows(self):
+        return self._query("SELECT key, stored_at, value FROM cache")
+
+    def put_cache(self, key, stored_at, value):
+        self._write("INSERT OR REPLACE INTO cache VALUES (?, ?, ?)", [(key, stored_at, value)])
+
+    def delete_cache(self, keys):
+        self._write("DELETE FROM cache WHERE key = ?", [(key,) for key in keys])
+
+    def import_json_cache(self, path):
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self._write(
+            "INSERT OR IGNORE INTO cache VALUES (?, ?, ?)",
+            [(key, stored_at, json.dumps(value)) for key, (stored_at, value) in data.items()],
+        )
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def record_tasks(self, rows):
+        self._write("INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def recent_tasks(self, limit=TASK_HISTORY):
+        rows = self._query(
+            "SELECT id, parent, kind, pkgid, status, message FROM tasks ORDER BY finished_at DESC LIMIT ?", (limit,)
+        )
+        return rows[::-1]
+
+    def delete_tasks(self, task_ids):
+        self._write("DELETE FROM tasks WHERE id = ?", [(task_id,) for task_id in task_ids])
+
+    def prune_tasks(self, before):
+        self._write("DELETE FROM tasks WHERE finished_at < ?", [(before,)])
+
+
+class CatalogCache:
+    def __init__(self, store, ttls=CACHE_TTLS):
+        self.store = store
+        self.ttls = dict(ttls)
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._load()
+
+    @staticmethod
+    def key(command, args):
+        return json.dumps([command] + list(args))
+
+    def _max_age(self, command):
+        ttl = self.ttls.get(command, 0)
+        return max(ttl, STALE_MAX_AGE) if command in STALE_COMMANDS else ttl
+
+    def get(self, command, args=()):
+        key = self.key(command, args)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.time() - stored_at <= self.ttls.get(command, 0):
+                return value
+            if command in STALE_COMMANDS:
+                return None
+            del self._entries[key]
+        self.store.delete_cache([key])
+        return None
+
+    def stale(self, command, args=()):
+        # Last stored value regardless of TTL, with its age in seconds.
+        with self._lock:
+            entry = self._entries.get(self.key(command, args))
+        if entry is None:
+            return None
+        return time.time() - entry[0], entry[1]
+
+    def put(self, command, args, value):
+        key = self.key(command, args)
+        stored_at = time.time()
+        with self._lock:
+            self._entries[key] = (stored_at, value)
+        self.store.put_cache(key, stored_at, json.dumps(value))
+
+    def entries(self, command):
+        prefix = json.dumps([command])[:-1]
+        now = time.time()
+        ttl = self.ttls.get(command, 0)
+        with self._lock:
+            return [
+                (json.loads(key)[1:], stored_at, value)
+                for key, (stored_at, value) in self._entries.items()
+                if key.startswith(prefix) and now - stored_at <= ttl
+            ]
+
+    def patch(self, command, args, update):
+        key = self.key(command, args)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            value = update(entry[1])
+            self._entries[key] = (entry[0], value)
+        self.store.put_cache(key, entry[0], json.dumps(value))
+        return True
+
+    def invalidate(self, *commands):
+        prefixes = tuple(json.dumps([c])[:-1] for c in commands)
+        with self._lock:
+            stale = [k for k in self._entries if k.startswith(prefixes)]
+            for key in stale:
+                del self._entries[key]
+        self.store.delete_cache(stale)
+        return len(stale)
+
+    def _load(self):
+        now = time.time()
+        expired = []
+        for key, stored_at, value in self.store.cache_rows():
+            try:
+                command = json.loads(key)[0]
+                if now - stored_at <= self._max_age(command):
+                    self._entries[key] = (stored_at, json.loads(value))
+                    continue
+            except (ValueError, IndexError):
+                pass
+            expired.append(key)
+        self.store.delete_cache(expired)
+
+
+class SourceRefresher:
+    def __init__(self, path, list_sources, update_source, is_idle, on_refreshed=None, interval=SOURCE_REFRESH_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self._list_sources = list_sources
+        self._update_source = update_source
+        self._is_idle = is_idle
+        self._on_refreshed = on_refreshed
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._state = self._load()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, daemon=True)
+            self._thread.start()
+
+    def wake(self):
+        self._wake.set()
+
+    def status(self, name):
+        with self._lock:
+            state = self._state.get(name)
+        if not state or not state["refreshed_at"]:
+            return {"RefreshedAgo": None, "RefreshError": state["error"] if state else None}
+        return {"RefreshedAgo": round(time.time() - state["refreshed_at"]), "RefreshError": state["error"]}
+
+    def _loop(self):
+        while True:
+            forced = self._wake.wait(SOURCE_REFRESH_TICK)
+            self._wake.clear()
+            if forced or self._is_idle():
+                try:
+                    self.refresh_due(force=forced)
+                except Exception as e:
+                    print(f"Source refresh failed: {e}")
+
+    def refresh_due(self, force=False):
+        updated = False
+        for source in self._list_sources():
+            name = source["Name"]
+            with self._lock:
+                state = self._state.setdefault(name, {"refreshed_at": 0, "failures": 0, "next_at": 0, "error": None})
+            if not force and (time.time() < state["next_at"] or not self._is_idle()):
+                continue
+            try:
+                self._update_source(name)
+            except Exception as e:
+                base, cap = SOURCE_REFRESH_BACKOFF
+                with self._lock:
+                    state["failures"] += 1
+                    state["next_at"] = time.time() + min(cap, base * 2 ** (state["failures"] - 1))
+                    state["error"] = str(e)
+            else:
+                updated = True
+                with self._lock:
+                    state.update(refreshed_at=time.time(), failures=0, error=None)
+                    state["next_at"] = state["refreshed_at"] + self.interval
+            self._save()
+        if updated and self._on_refreshed:
+            self._on_refreshed()
+        return updated
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        with self._lock:
+            data = json.dumps(self._state)
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"Failed to write source state {self.path}: {e}")
+
+
+class TaskLog:
+    # Lines go to an append-only file; memory holds only the byte offset of each
+    # line and a short tail, so a task can print millions of lines.
+    def __init__(self, path, tail=TASK_LOG_TAIL, existing=False):
+        self.path = path
+        self._lock = threading.Lock()
+        self._starts = array("Q")
+        self._size = 0
+        self._pending = []
+        self._pending_bytes = 0
+        self._tail = deque(maxlen=tail)
+        self._indexed = not existing
+
+    def __len__(self):
+        with self._lock:
+            self._index()
+            return len(self._starts)
+
+    def _index(self):
+        # Logs of tasks from an earlier run are only scanned for line offsets
+        # when somebody actually opens them.
+        if self._indexed:
+            return
+        self._indexed = True
+        try:
+            with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                size = len(view)
+                start = 0
+                while start < size:
+                    self._starts.append(start)
+                    end = view.find(b"\n", start)
+                    start = size if end < 0 else end + 1
+                self._size = size
+        except (OSError, ValueError):
+            pass
+
+    def append(self, line):
+        data = (line + "\n").encode("utf-8", "replace")
+        with self._lock:
+            self._starts.append(self._size)
+            self._size += len(data)
+            self._pending.append(data)
+            self._pending_bytes += len(data)
+            self._tail.append(line)
+            if self._pending_bytes >= TASK_LOG_FLUSH_BYTES:
+                self._flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "ab") as f:
+                f.write(b"".join(self._pending))
+        except OSError as e:
+            print(f"Failed to write task log {self.path}: {e}")
+        self._pending = []
+        self._pending_bytes = 0
+
+    def read(self, offset=None, limit=TASK_LOG_PAGE):
+        with self._lock:
+            self._index()
+            total = len(self._starts)
+            if offset is None:
+                offset = total - limit
+            offset = max(0, min(offset, total))
+            end = min(total, offset + limit)
+            if offset >= total - len(self._tail):
+                lines = list(self._tail)[offset - (total - len(self._tail)):end - (total - len(self._tail))]
+                return offset, total, lines
+            self._flush()
+            start_byte = self._starts[offset]
+            end_byte = self._starts[end] if end < total else self._size
+        try:
+            with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                data = view[start_byte:end_byte]
+        except (OSError, ValueError) as e:
+            print(f"Failed to read task log {self.path}: {e}")
+            return offset, total, []
+        return offset, total, data.decode("utf-8", "replace").split("\n")[:end - offset]
+
+    def text(self):
+        return "\n".join(self.read(0, len(self))[2])
+
+    def delete(self):
+        with self._lock:
+            self._pending = []
+            self._pending_bytes = 0
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def _purge_task_logs(directory, retention=TASK_LOG_RETENTION):
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return
+    cutoff = time.time() - retention
+    for name in names:
+        path = os.path.join(directory, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+_WORD_SPLIT = re.compile(r"[\s.\-_]+")
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class LRUCache:
+    def __init__(self, max_size=256, ttl=6 * 60 * 60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+
+class SearchIndex:
+    def __init__(self, ttl=CACHE_TTLS["search"]):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._rows = {}
+        self._fields = {}
+        self._words = {}
+        self._seen = {}
+        self._trigrams = {}
+        self._covered = {}
+
+    @staticmethod
+    def _searchable(row):
+        name, pkgid = row[0].lower(), row[1].lower()
+        publisher = pkgid.split(".", 1)[0] if "." in pkgid else ""
+        match = row[4] if len(row) > 4 else ""
+        tag = match.split(":", 1)[1].strip().lower() if ":" in match else ""
+        return tuple(f for f in (name, pkgid, publisher, tag) if f)
+
+    def add(self, rows, query=None, at=None):
+        at = at or time.time()
+        with self._lock:
+            for row in rows:
+                if len(row) < 2 or not row[1]:
+                    continue
+                pkgid = row[1]
+                self._drop(pkgid)
+                fields = self._searchable(row)
+                self._rows[pkgid] = row
+                self._fields[pkgid] = fields
+                self._words[pkgid] = tuple(w for field in fields for w in _WORD_SPLIT.split(field) if w)
+                self._seen[pkgid] = at
+                for field in fields:
+                    for gram in _trigrams(field):
+                        self._trigrams.setdefault(gram, set()).add(pkgid)
+            if query:
+                self._covered[query] = max(at, self._covered.get(query, 0))
+
+    def _drop(self, pkgid):
+        for field in self._fields.pop(pkgid, ()):
+            for gram in _trigrams(field):
+                ids = self._trigrams.get(gram)
+                if ids:
+                    ids.discard(pkgid)
+        self._rows.pop(pkgid, None)
+        self._words.pop(pkgid, None)
+        self._seen.pop(pkgid, None)
+
+    def get(self, pkgid):
+        with self._lock:
+            return self._rows.get(pkgid)
+
+    def covers(self, query):
+        # winget matches by substring, so results for "chro" include every hit for "chrome".
+        now = time.time()
+        with self._lock:
+            return any(q in query and now - at <= self.ttl for q, at in self._covered.items())
+
+    def search(self, query, limit=200, exact=False):
+        query = query.strip().lower()
+        if not query:
+            return []
+        now = time.time()
+        with self._lock:
+            grams = _trigrams(query)
+            if grams:
+                postings = sorted((self._trigrams.get(gram, ()) for gram in grams), key=len)
+                candidates = [(pkgid, 1.0) for pkgid in set(postings[0]).intersection(*postings[1:])]
+                if not candidates and not exact:
+                    counts = {}
+                    for posting in postings:
+                        for pkgid in posting:
+                            counts[pkgid] = counts.get(pkgid, 0) + 1
+                    candidates = [(pkgid, n / len(grams)) for pkgid, n in counts.items() if n * 2 >= len(grams)]
+            else:
+                candidates = [(pkgid, 0.0) for pkgid in self._fields]
+            scored = []
+            for pkgid, overlap in candidates:
+                if now - self._seen[pkgid] > self.ttl:
+                    continue
+                score = self._score(query, self._fields[pkgid], self._words[pkgid], overlap)
+                # Trigram overlap without a substring hit is a guess winget would not make.
+                if score is not None and not (exact and score > 3):
+                    scored.append((score, self._rows[pkgid][0].lower(), pkgid))
+            ranked = sorted(scored) if limit is None else heapq.nsmallest(limit, scored)
+            return [self._rows[pkgid] for _, _, pkgid in ranked]
+
+    @staticmethod
+    def _score(query, fields, words, overlap):
+        name, pkgid = fields[0], fields[1] if len(fields) > 1 else ""
+        if query == name or query == pkgid:
+            return 0
+        if name.startswith(query) or pkgid.startswith(query):
+            return 1
+        if any(word.startswith(query) for word in words):
+            return 2
+        if any(query in field for field in fields):
+            return 3
+        if overlap >= 0.5:
+            return 4 + (1 - overlap)
+        return None
+
+
+class EventPump:
+    def __init__(self, emit, interval=0.05, max_lines=200, history=None):
+        self._emit = emit
+        self.history = history
+        self.interval = interval
+        self.max_lines = max_lines
+        self._cond = threading.Condition()
+        self._emit_lock = threading.Lock()
+        self._batch = self._new_batch()
+        self._pending = 0
+        self._lines = 0
+        self._thread = None
+        self.events = 0
+        self.flushes = 0
+
+    @staticmethod
+    def _new_batch():
+        return {"added": [], "started": [], "queue": None, "log": [], "tasks": {}, "progress": {}, "finished": []}
+
+    def add_task(self, task_id, kind, pkgid, status="running", parent=None):
+        with self._cond:
+            self._batch["added"].append([task_id, kind, pkgid, status, parent])
+            self._queued()
+
+    def progress(self, task_id, percent, label=None):
+        with self._cond:
+            self._batch["progress"][task_id] = [percent, label]
+            self._queued()
+
+    def started(self, task_id):
+        with self._cond:
+            self._batch["started"].append(task_id)
+            self._queued()
+
+    def queue(self, positions):
+        with self._cond:
+            self._batch["queue"] = positions
+            self._queued()
+
+    def log(self, line):
+        if self.history is not None:
+            self.history.append(line)
+        with self._cond:
+            self._batch["log"].append(line)
+            self._lines += 1
+            self._queued()
+
+    def task_line(self, task_id, line, is_error=False):
+        with self._cond:
+            entry = self._batch["tasks"].setdefault(task_id, {"lines": [], "error": False})
+            entry["lines"].append(line)
+            entry["error"] = entry["error"] or is_error
+            self._lines += 1
+            self._queued()
+
+    def finish(self, task_id, status, message, delta=None):
+        with self._cond:
+            self._batch["finished"].append([task_id, status, message, delta])
+            self._queued()
+
+    def _queued(self):
+        self.events += 1
+        self._pending += 1
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                deadline = time.monotonic() + self.interval
+                while self._lines < self.max_lines:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            self.flush()
+
+    def flush(self):
+        with self._emit_lock:
+            with self._cond:
+                if not self._pending:
+                    return
+                batch = self._batch
+                self._batch = self._new_batch()
+                self._pending = 0
+                self._lines = 0
+                self.flushes += 1
+            self._emit(batch)
+
+    def stats(self):
+        return {
+            "events": self.events,
+            "flushes": self.flushes,
+            "bridge_calls_saved": self.events - self.flushes,
+        }
+
+
+ERROR_KEYWORDS = ('fail', 'cannot find', 'error', 'no installed package found')
+UPGRADE_FOUND = re.compile(r"^\((\d+)/(\d+)\)\s+Found\s+(.+?)\s+\[(.+?)\]")
+
+SPINNER_FRAMES = {"-", "\\", "|", "/"}
+LINE_BREAK = re.compile(r"\r\n|\r|\n")
+PROGRESS_BYTES = re.compile(r"([\d.]+)\s*([KMGT]?B)\s*/\s*([\d.]+)\s*([KMGT]?B)")
+PROGRESS_PERCENT = re.compile(r"(\d{1,3}(?:\.\d+)?)\s*%")
+PROGRESS_BAR_CHARS = ("\u2588", "\u2592")
+BYTE_UNITS = {"B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3, "TB": 1024 ** 4}
+INSTALLER_PHASES = (
+    ("Downloading", "Downloading"),
+    ("Successfully verified installer hash", "Verified"),
+    ("Starting package install", "Installing"),
+    ("Starting package uninstall", "Uninstalling"),
+    ("Successfully installed", "Installed"),
+    ("Successfully uninstalled", "Uninstalled"),
+)
+_PHASE_PREFIXES = tuple(prefix for prefix, _ in INSTALLER_PHASES)
+PROGRESS_INTERVAL_SECONDS = 0.25
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 10
+
+
+def parse_progress(segment):
+    sized = PROGRESS_BYTES.search(segment)
+    if sized:
+        done = float(sized.group(1)) * BYTE_UNITS[sized.group(2)]
+        total = float(sized.group(3)) * BYTE_UNITS[sized.group(4)]
+        if total:
+            return min(100, round(done * 100 / total)), sized.group(0)
+    if any(ch in segment for ch in PROGRESS_BAR_CHARS):
+        percent = PROGRESS_PERCENT.search(segment)
+        if percent:
+            return min(100, round(float(percent.group(1)))), percent.group(0)
+    return None
+
+
+def installer_phase(line):
+    if not line.startswith(_PHASE_PREFIXES):
+        return None
+    for prefix, phase in INSTALLER_PHASES:
+        if line.startswith(prefix):
+            return phase
+    return None
+
+
+def iter_task_output(stream, encoding=None, chunk_size=65536):
+    # winget redraws spinners and progress bars in place with a bare \r; reading
+    # raw chunks keeps those redraws apart from real lines instead of letting
+    # universal newlines turn each one into a log entry.
+    decoder = codecs.getincrementaldecoder(encoding or locale.getpreferredencoding(False))("replace")
+    pending = ""
+    while True:
+        chunk = stream.read1(chunk_size)
+        pending += decoder.decode(chunk, final=not chunk)
+        start = 0
+        for brk in LINE_BREAK.finditer(pending):
+            if chunk and brk.group() == "\r" and brk.end() == len(pending):
+                break  # may be the first half of a \r\n split across reads
+            event = _task_output_event(pending[start:brk.start()], brk.group() == "\r")
+            start = brk.end()
+            if event:
+                yield event
+        pending = pending[start:]
+        if not chunk:
+            event = _task_output_event(pending, False)
+            if event:
+                yield event
+            return
+
+
+def _task_output_event(segment, redraw):
+    stripped = segment.strip()
+    if stripped in SPINNER_FRAMES or (redraw and not stripped):
+        return None
+    if redraw or "/" in stripped or "%" in stripped:
+        progress = parse_progress(stripped)
+        if progress:
+            return "progress", progress
+    return "line", stripped
+
+
+class TaskScheduler:
+    def __init__(self, max_concurrent=2, on_change=None, on_idle=None, metrics=None):
+        self.max_concurrent = max_concurrent
+        self._on_change = on_change
+        self._on_idle = on_idle
+        self._metrics = metrics
+        self._submitted = {}
+        self._lock = threading.Lock()
+        self._queue = []
+        self._jobs = {}
+        self._keys = {}
+        self._running = set()
+        self._seq = itertools.count()
+
+    def submit(self, task_id, key, run, priority=PRIORITY_INTERACTIVE):
+        with self._lock:
+            if key in self._keys:
+                return self._keys[key]
+            self._keys[key] = task_id
+            self._jobs[task_id] = (key, run)
+            self._submitted[task_id] = time.perf_counter()
+            heapq.heappush(self._queue, (priority, next(self._seq), task_id))
+            started = self._fill()
+        self._changed(started)
+        return task_id
+
+    def find(self, key):
+        with self._lock:
+            return self._keys.get(key)
+
+    def cancel(self, task_id):
+        with self._lock:
+            if task_id not in self._jobs or task_id in self._running:
+                return False
+            key, _ = self._jobs.pop(task_id)
+            self._keys.pop(key, None)
+            self._submitted.pop(task_id, None)
+        self._changed([])
+        return True
+
+    def set_max_concurrent(self, value):
+        with self._lock:
+            self.max_concurrent = max(1, int(value))
+            started = self._fill()
+        self._changed(started)
+
+    def positions(self):
+        with self._lock:
+            queued = [task_id for _, _, task_id in sorted(self._queue) if task_id in self._jobs]
+        return {task_id: i + 1 for i, task_id in enumerate(queued)}
+
+    def _fill(self):
+        started = []
+        while self._queue and len(self._running) < self.max_concurrent:
+            _, _, task_id = heapq.heappop(self._queue)
+            if task_id not in self._jobs:
+                continue
+            self._running.add(task_id)
+            started.append(task_id)
+        return started
+
+    def _changed(self, started):
+        for task_id in started:
+            threading.Thread(target=self._run, args=(task_id,), daemon=True).start()
+        if self._on_change:
+            self._on_change(self.positions())
+        if self._on_idle and self.is_idle():
+            self._on_idle()
+
+    def is_idle(self):
+        with self._lock:
+            return not self._jobs
+
+    def _run(self, task_id):
+        began = time.perf_counter()
+        try:
+            self._jobs[task_id][1]()
+        finally:
+            with self._lock:
+                self._running.discard(task_id)
+                key, _ = self._jobs.pop(task_id)
+                self._keys.pop(key, None)
+                submitted = self._submitted.pop(task_id, began)
+                started = self._fill()
+            if self._metrics:
+                self._metrics.record(
+                    f"task.{key[0]}",
+                    wait_ms=round((began - submitted) * 1000, 2),
+                    total_ms=round((time.perf_counter() - began) * 1000, 2),
+                )
+            self._changed(started)
+
+
 html_code = r"""
 <!DOCTYPE html>
 <html lang="en">
 <head>
   <meta charset="UTF-8" />
   <title>Winget GUI - Complete</title>
-  <script src="https://cdn.tailwindcss.com"></script>
   <style>
+    *, ::before, ::after { box-sizing: border-box; border: 0 solid #e5e7eb; }
+    html { line-height: 1.5; -webkit-text-size-adjust: 100%; }
+    body { margin: 0; font-family: ui-sans-serif, system-ui, -apple-system, "Segoe UI", Roboto, Arial, sans-serif; }
+    h2, pre { margin: 0; font-size: inherit; font-weight: inherit; }
+    button, input, select { font: inherit; color: inherit; margin: 0; }
+    button { background-color: transparent; cursor: pointer; padding: 0; }
+    button:disabled { cursor: default; }
+    b, strong { font-weight: bolder; }
+
+    .block { display: block; }
+    .flex { display: flex; }
+    .inline-flex { display: inline-flex; }
+    .grid { display: grid; }
+    .hidden { display: none; }
+    .fixed { position: fixed; }
+    .relative { position: relative; }
+    .sticky { position: sticky; }
+    .inset-0 { inset: 0; }
+    .top-0 { top: 0; }
+    .z-50 { z-index: 50; }
+    .flex-1 { flex: 1 1 0%; }
+    .flex-grow { flex-grow: 1; }
+    .flex-col { flex-direction: column; }
+    .grid-cols-1 { grid-template-columns: repeat(1, minmax(0, 1fr)); }
+    .items-center { align-items: center; }
+    .justify-center { justify-content: center; }
+    .justify-between { justify-content: space-between; }
+    .justify-end { justify-content: flex-end; }
+    .gap-6 { gap: 1.5rem; }
+    .space-x-2 > :not([hidden]) ~ :not([hidden]) { margin-left: 0.5rem; }
+    .space-y-1 > :not([hidden]) ~ :not([hidden]) { margin-top: 0.25rem; }
+    .space-y-2 > :not([hidden]) ~ :not([hidden]) { margin-top: 0.5rem; }
+    .space-y-4 > :not([hidden]) ~ :not([hidden]) { margin-top: 1rem; }
+    .overflow-auto { overflow: auto; }
+    .overflow-hidden { overflow: hidden; }
+    .overflow-y-auto { overflow-y: auto; }
+    .truncate { overflow: hidden; text-overflow: ellipsis; white-space: nowrap; }
+    .whitespace-nowrap { white-space: nowrap; }
+    .whitespace-pre { white-space: pre; }
+    .whitespace-pre-wrap { white-space: pre-wrap; }
+
+    .w-5 { width: 1.25rem; }
+    .w-16 { width: 4rem; }
+    .w-32 { width: 8rem; }
+    .w-64 { width: 16rem; }
+    .w-full { width: 100%; }
+    .h-2 { height: 0.5rem; }
+    .h-5 { height: 1.25rem; }
+    .h-48 { height: 12rem; }
+    .h-screen { height: 100vh; }
+    .min-h-screen { min-height: 100vh; }
+    .max-h-32 { max-height: 8rem; }
+    .max-h-96 { max-height: 24rem; }
+    .max-h-screen { max-height: 100vh; }
+    .max-w-xl { max-width: 36rem; }
+    .max-w-4xl { max-width: 56rem; }
+    .mx-auto { margin-left: auto; margin-right: auto; }
+    .mt-4 { margin-top: 1rem; }
+    .mt-auto { margin-top: auto; }
+    .mb-1 { margin-bottom: 0.25rem; }
+    .mb-2 { margin-bottom: 0.5rem; }
+    .mb-3 { margin-bottom: 0.75rem; }
+    .mb-4 { margin-bottom: 1rem; }
+    .mb-6 { margin-bottom: 1.5rem; }
+    .ml-2 { margin-left: 0.5rem; }
+    .ml-6 { margin-left: 1.5rem; }
+    .mr-2 { margin-right: 0.5rem; }
+    .p-2 { padding: 0.5rem; }
+    .p-4 { padding: 1rem; }
+    .p-5 { padding: 1.25rem; }
+    .p-6 { padding: 1.5rem; }
+    .px-2 { padding-left: 0.5rem; padding-right: 0.5rem; }
+    .px-3 { padding-left: 0.75rem; padding-right: 0.75rem; }
+    .px-4 { padding-left: 1rem; padding-right: 1rem; }
+    .px-6 { padding-left: 1.5rem; padding-right: 1.5rem; }
+    .py-1 { padding-top: 0.25rem; padding-bottom: 0.25rem; }
+    .py-2 { padding-top: 0.5rem; padding-bottom: 0.5rem; }
+    .pt-1 { padding-top: 0.25rem; }
+    .pt-2 { padding-top: 0.5rem; }
+    .pb-4 { padding-bottom: 1rem; }
+
+    .border { border-width: 1px; }
+    .border-t { border-top-width: 1px; }
+    .border-b { border-bottom-width: 1px; }
+    .border-gray-200 { border-color: #e5e7eb; }
+    .border-gray-300 { border-color: #d1d5db; }
+    .rounded { border-radius: 0.25rem; }
+    .rounded-md { border-radius: 0.375rem; }
+    .rounded-lg { border-radius: 0.5rem; }
+    .shadow { box-shadow: 0 1px 3px 0 rgba(0,0,0,.1), 0 1px 2px -1px rgba(0,0,0,.1); }
+    .shadow-lg { box-shadow: 0 10px 15px -3px rgba(0,0,0,.1), 0 4px 6px -4px rgba(0,0,0,.1); }
+    .shadow-none { box-shadow: none; }
+
+    .bg-white { background-color: #fff; }
+    .bg-black { background-color: #000; }
+    .bg-black.bg-opacity-40 { background-color: rgba(0,0,0,.4); }
+    .bg-gray-50 { background-color: #f9fafb; }
+    .bg-gray-100 { background-color: #f3f4f6; }
+    .bg-gray-300 { background-color: #d1d5db; }
+    .bg-gray-400 { background-color: #9ca3af; }
+    .bg-gray-500 { background-color: #6b7280; }
+    .bg-gray-600 { background-color: #4b5563; }
+    .bg-indigo-200 { background-color: #c7d2fe; }
+    .bg-indigo-500 { background-color: #6366f1; }
+    .bg-indigo-600 { background-color: #4f46e5; }
+    .bg-green-200 { background-color: #bbf7d0; }
+    .bg-green-600 { background-color: #16a34a; }
+    .bg-red-200 { background-color: #fecaca; }
+    .bg-red-500 { background-color: #ef4444; }
+    .bg-red-600 { background-color: #dc2626; }
+    .hover\:bg-gray-400:hover { background-color: #9ca3af; }
+    .hover\:bg-gray-600:hover { background-color: #4b5563; }
+    .hover\:bg-gray-700:hover { background-color: #374151; }
+    .hover\:bg-indigo-100:hover { background-color: #e0e7ff; }
+    .hover\:bg-indigo-700:hover { background-color: #4338ca; }
+    .hover\:bg-green-700:hover { background-color: #15803d; }
+    .hover\:bg-red-700:hover { background-color: #b91c1c; }
+    .hover\:underline:hover { text-decoration: underline; }
+    .focus\:bg-indigo-200:focus { background-color: #c7d2fe; }
+    .focus\:outline-none:focus { outline: 2px solid transparent; outline-offset: 2px; }
+    .focus\:ring-2:focus { box-shadow: 0 0 0 2px #6366f1; }
+    .disabled\:opacity-50:disabled { opacity: .5; }
+
+    .text-left { text-align: left; }
+    .text-center { text-align: center; }
+    .font-mono { font-family: ui-monospace, SFMono-Regular, Menlo, Consolas, monospace; }
+    .text-xs { font-size: 0.75rem; line-height: 1rem; }
+    .text-sm { font-size: 0.875rem; line-height: 1.25rem; }
+    .text-lg { font-size: 1.125rem; line-height: 1.75rem; }
+    .text-xl { font-size: 1.25rem; line-height: 1.75rem; }
+    .font-medium { font-weight: 500; }
+    .font-semibold { font-weight: 600; }
+    .font-bold { font-weight: 700; }
+    .italic { font-style: italic; }
+    .text-white { color: #fff; }
+    .text-gray-500 { color: #6b7280; }
+    .text-gray-600 { color: #4b5563; }
+    .text-gray-700 { color: #374151; }
+    .text-indigo-600 { color: #4f46e5; }
+    .text-red-600 { color: #dc2626; }
+    .form-checkbox { accent-color: #4f46e5; }
+    .transition { transition: color, background-color, border-color, box-shadow .15s cubic-bezier(.4,0,.2,1); }
+    .transition-all { transition: all .15s cubic-bezier(.4,0,.2,1); }
+    .duration-500 { transition-duration: .5s; }
+    @media (min-width: 768px) {
+      .md\:grid-cols-2 { grid-template-columns: repeat(2, minmax(0, 1fr)); }
+    }
+
     .scrollbar-thin::-webkit-scrollbar {
       width: 8px; height:8px;
     }
@@ -129,6 +1562,31 @@ html_code = r"""
     .copy-button:hover {
       background-color: #2563eb;
     }
+    .diag-table {
+      width: 100%;
+      border-collapse: collapse;
+      font-size: 0.75rem;
+    }
+    .diag-table th, .diag-table td {
+      padding: 2px 6px;
+      text-align: right;
+      border-bottom: 1px solid #e5e7eb;
+    }
+    .diag-table th:first-child, .diag-table td:first-child {
+      text-align: left;
+    }
+    .diag-histogram {
+      display: flex;
+      align-items: flex-end;
+      gap: 1px;
+      height: 24px;
+      width: 120px;
+    }
+    .diag-histogram div {
+      flex: 1;
+      background-color: #6366f1;
+      min-height: 1px;
+    }
   </style>
 </head>
 
@@ -136,7 +1594,7 @@ html_code = r"""
 <!-- Details Modal -->
 <div id="detailModal" class="hidden fixed inset-0 bg-black bg-opacity-40 flex items-center justify-center z-50">
   <div class="bg-white rounded-lg shadow-lg max-w-xl w-full p-6 relative">
-    <h2 class="text-xl font-semibold mb-4">Package Details</h2>
+    <h2 id="detailTitle" class="text-xl font-semibold mb-4">Package Details</h2>
     <div id="detailContent" class="max-h-96 overflow-y-auto text-sm space-y-2"></div>
     <div class="mt-4 flex justify-end">
       <button onclick="closeDetailModal()" class="bg-gray-600 hover:bg-gray-700 text-white py-1 px-4 rounded">Close</button>
@@ -152,17 +1610,23 @@ html_code = r"""
       <button id="tabTasks" class="text-left px-4 py-2 rounded hover:bg-indigo-100 focus:outline-none focus:bg-indigo-200">Tasks</button>
       <button id="tabUpdates" class="text-left px-4 py-2 rounded hover:bg-indigo-100 focus:outline-none focus:bg-indigo-200">Updates</button>
       <button id="tabSources" class="text-left px-4 py-2 rounded hover:bg-indigo-100 focus:outline-none focus:bg-indigo-200">Sources</button>
+      <button id="tabDiagnostics" class="text-left px-4 py-2 rounded hover:bg-indigo-100 focus:outline-none focus:bg-indigo-200">Diagnostics</button>
     </nav>
-    <div id="sidebarLogs" class="p-4 border-t border-gray-200 text-xs font-mono h-48 overflow-y-auto scrollbar-thin whitespace-pre"></div>
+    <div class="flex justify-between items-center px-4 pt-2 border-t border-gray-200 text-xs text-gray-600">
+      <span>Activity</span>
+      <button onclick="loadActivityLog()" class="text-indigo-600 hover:underline">Full history</button>
+    </div>
+    <div id="sidebarLogs" class="px-4 pb-4 pt-1 text-xs font-mono h-48 overflow-y-auto scrollbar-thin whitespace-pre"></div>
   </div>
 
-  <div class="flex-1 p-6 overflow-auto max-h-screen">
+  <div id="mainPanel" class="flex-1 p-6 overflow-auto max-h-screen">
     <!-- Search Panel -->
     <div id="searchContent" class="">
       <div class="max-w-4xl mx-auto">
         <div class="flex space-x-2 mb-6">
           <input id="searchBox" type="search" placeholder="Search for apps..."
-            class="flex-1 px-4 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-indigo-500" oninput="searchFilter()"/>
+            class="flex-1 px-4 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-indigo-500"
+            oninput="searchInput()" onkeydown="if(event.key === 'Enter') doSearch()"/>
           <button onclick="doSearch()"
             class="bg-indigo-600 hover:bg-indigo-700 text-white px-6 py-2 rounded-md transition">Search</button>
         </div>
@@ -173,83 +1637,121 @@ html_code = r"""
       </div>
     </div>
 
-    <!-- Packages Panel -->
-    <div id="packagesContent" class="hidden max-w-4xl mx-auto">
-      <div class="flex mb-2">
-        <button onclick="uninstallSelected()" class="bg-red-600 text-white px-3 py-1 rounded">Uninstall Selected</button>
-      </div>
-      <input id="packageSearchBox" oninput="filterInstalledPackages()" placeholder="Search installed packages..."
-        class="mb-4 px-3 py-2 border border-gray-300 rounded w-full" type="search" />
-      <h2 class="text-xl font-semibold mb-4">Installed Packages</h2>
-      <div id="installedGrid" class="grid grid-cols-1 md:grid-cols-2 gap-6"></div>
-    </div>
-
-    <!-- Tasks Panel -->
-    <div id="tasksContent" class="hidden max-w-4xl mx-auto">
-      <h2 class="text-xl font-semibold mb-4">Tasks</h2>
-      <div id="tasksGrid" class="space-y-4"></div>
-    </div>
-
-    <!-- Updates Panel -->
-    <div id="updatesContent" class="hidden max-w-4xl mx-auto">
-      <div class="max-w-4xl mx-auto">
-        <div class="flex space-x-2 mb-6">
-          <input id="updateSearchBox" type="search" placeholder="Search available updates..."
-            class="flex-1 px-4 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-indigo-500" oninput="filterUpdates()" />
-          <button onclick="loadAvailableUpdates()"
-            class="bg-indigo-600 hover:bg-indigo-700 text-white px-3 py-1 rounded ml-2 transition">Refresh</button>
-        </div>
-        <div class="flex mb-4">
-          <button onclick="upgradeSelected()" class="bg-indigo-600 text-white px-3 py-1 rounded mr-2">Upgrade Selected</button>
-        </div>
-        <div id="updatesGrid" class="grid grid-cols-1 md:grid-cols-2 gap-6"></div>
-      </div>
-    </div>
-
-    <!-- Sources Panel -->
-    <div id="sourcesContent" class="hidden max-w-4xl mx-auto">
-      <div class="flex space-x-2 mb-4">
-        <input id="sourceName" type="text" placeholder="Source name" class="px-2 py-1 border rounded w-32" />
-        <input id="sourceArg" type="text" placeholder="Source URL/Path" class="px-2 py-1 border rounded w-64" />
-        <input id="sourceType" type="text" placeholder="(Optional) Type" class="px-2 py-1 border rounded w-32" />
-        <button onclick="handleSourceForm()" id="sourceFormBtn" class="bg-green-600 hover:bg-green-700 text-white px-3 py-1 rounded">Add</button>
-        <button onclick="resetSourceForm()" id="sourceResetBtn" class="bg-gray-400 hover:bg-gray-600 text-white px-3 py-1 rounded hidden">Cancel Edit</button>
-      </div>
-      <h2 class="text-xl font-semibold mb-4">Sources</h2>
-      <div id="sourcesGrid" class="grid grid-cols-1 md:grid-cols-2 gap-6"></div>
-    </div>
+    <!-- Packages Panel (markup from app_panels, mounted on first use) -->
+    <div id="packagesContent" class="hidden max-w-4xl mx-auto"></div>
+    <!-- Tasks Panel (markup from app_panels, mounted on first use) -->
+    <div id="tasksContent" class="hidden max-w-4xl mx-auto"></div>
+    <!-- Updates Panel (markup from app_panels, mounted on first use) -->
+    <div id="updatesContent" class="hidden max-w-4xl mx-auto"></div>
+    <!-- Sources Panel (markup from app_panels, mounted on first use) -->
+    <div id="sourcesContent" class="hidden max-w-4xl mx-auto"></div>
+    <!-- Diagnostics Panel (markup from app_panels, mounted on first use) -->
+    <div id="diagnosticsContent" class="hidden max-w-4xl mx-auto"></div>
   </div>
 
 <script>
+const SEARCH_DEBOUNCE_MS = 300;
+const SEARCH_MIN_CHARS = 2;
 let installedIds = new Set();
 let tasks = {};
-let editingSourceOrigName = null;
 let allUpdates = [];
+let knownSources = null;
+const staleData = {};
 
 const tabs = {
   search: document.getElementById('tabSearch'),
   packages: document.getElementById('tabPackages'),
   tasks: document.getElementById('tabTasks'),
   updates: document.getElementById('tabUpdates'),
-  sources: document.getElementById('tabSources')
+  sources: document.getElementById('tabSources'),
+  diagnostics: document.getElementById('tabDiagnostics')
 };
 const contents = {
   search: document.getElementById('searchContent'),
   packages: document.getElementById('packagesContent'),
   tasks: document.getElementById('tasksContent'),
   updates: document.getElementById('updatesContent'),
-  sources: document.getElementById('sourcesContent')
+  sources: document.getElementById('sourcesContent'),
+  diagnostics: document.getElementById('diagnosticsContent')
 };
 
 const sidebarLogs = document.getElementById('sidebarLogs');
 
+// Elements the rest of the page writes to before their panel is mounted (grids
+// filled by task events, for instance) live detached until the panel takes them.
+const panelSlots = {};
+const panelLoads = {search: Promise.resolve()};
+function slot(id){
+  let el = document.getElementById(id) || panelSlots[id];
+  if(!el){
+    el = panelSlots[id] = document.createElement('div');
+    el.id = id;
+  }
+  return el;
+}
+
+function mountPanel(key){
+  if(!panelLoads[key]) panelLoads[key] = loadPanel(key);
+  return panelLoads[key];
+}
+
+async function loadPanel(key){
+  const started = performance.now();
+  const panel = await window.pywebview.api.get_panel(key);
+  contents[key].innerHTML = panel.html;
+  contents[key].querySelectorAll('[data-slot]').forEach(el=>{
+    const kept = panelSlots[el.id];
+    if(!kept) return;
+    kept.className = el.className;
+    el.replaceWith(kept);
+    delete panelSlots[el.id];
+  });
+  if(panel.script){
+    const script = document.createElement('script');
+    script.textContent = panel.script;
+    document.body.appendChild(script);
+  }
+  reportTiming(`panel.${key}`, performance.now() - started);
+}
+
+function reportTiming(name, ms){
+  window.pywebview.api.report_timing(name, ms);
+}
+
+function markInteractive(){
+  requestAnimationFrame(()=>{
+    const ms = performance.now();
+    appendLog(`Ready in ${Math.round(ms)} ms`);
+    reportTiming('interactive', ms);
+  });
+}
+if(window.pywebview && window.pywebview.api) markInteractive();
+else window.addEventListener('pywebviewready', markInteractive, {once: true});
+
+// Render timings stay in the page; the Diagnostics panel reads them directly
+// instead of sending every frame over the bridge.
+const UI_TIMING_SAMPLES = 256;
+const uiTimings = {};
+function recordUiTiming(name, ms){
+  const series = uiTimings[name] || (uiTimings[name] = {count: 0, samples: []});
+  series.count++;
+  series.samples.push(ms);
+  if(series.samples.length > UI_TIMING_SAMPLES) series.samples.shift();
+}
+
+function inputFilter(id){
+  const input = document.getElementById(id);
+  return input ? input.value.toLowerCase() : '';
+}
+
 tabs.search.addEventListener('click', ()=>switchTab('search'));
 tabs.packages.addEventListener('click', ()=>switchTab('packages'));
 tabs.tasks.addEventListener('click', ()=>switchTab('tasks'));
-tabs.updates.addEventListener('click', () => {switchTab('updates'); loadAvailableUpdates();});
+tabs.updates.addEventListener('click', () => switchTab('updates').then(()=>loadAvailableUpdates()));
 tabs.sources.addEventListener('click', ()=>switchTab('sources'));
+tabs.diagnostics.addEventListener('click', ()=>switchTab('diagnostics'));
 
-function switchTab(tabKey){
+async function switchTab(tabKey){
   Object.keys(tabs).forEach(k=>{
     if(k===tabKey){
       tabs[k].classList.add('font-semibold', 'text-indigo-600');
@@ -259,7 +1761,12 @@ function switchTab(tabKey){
       contents[k].classList.add('hidden');
     }
   });
+  await mountPanel(tabKey);
+  showStale(tabKey === 'packages' ? 'installed' : tabKey);
   if(tabKey==='packages'){
+    window.pywebview.api.get_settings().then(settings=>{
+      document.getElementById('installedBackend').value = settings.installed_backend;
+    });
     loadInstalledPackages();
   }
   if(tabKey==='tasks'){
@@ -269,95 +1776,286 @@ function switchTab(tabKey){
     loadSources();
     resetSourceForm();
   }
+  if(tabKey==='diagnostics'){
+    loadDiagnostics();
+  }
+  scheduleGridRender(true);
 }
 
-function addTask(id, type, pkgid){
-  tasks[id] = {id:id, type:type, pkgid:pkgid, status:'running', message:'', progress:0, procExist:true};
-  renderTasks();
+const TASK_LOG_LIMIT = 500;
+const taskViews = {};
+const dirtyTasks = new Set();
+
+function addTask(id, type, pkgid, render = true, status = 'running', parent = null){
+  tasks[id] = {id:id, type:type, pkgid:pkgid, parent:parent, status:status, queuePos:0, lines:[], dropped:0, pending:[], progress:0, progressLabel:'', procExist:true, archived:false};
+  markTaskDirty(id, render);
 }
-function completeTask(id){
+function completeTask(id, render = true, delta = null){
   if (!tasks[id]) return;
   tasks[id].status = 'success';
   tasks[id].progress = 100;
   tasks[id].procExist = false;
-  renderTasks();
-  refreshPackagesAfterTask(tasks[id].type, tasks[id].pkgid);
+  markTaskDirty(id, render);
+  if(delta) applyInstalledDelta(delta);
 }
-function refreshPackagesAfterTask(taskType, pkgid){
-  window.pywebview.api.winget_list_installed().then(raw=>{
-    let results = [];
-    try{
-      results = JSON.parse(raw);
-      installedIds = new Set(results.map(r=>r[1]));
-      renderInstalledPackages(results);
-      if(contents['search'].classList.contains('hidden')===false){
-        doSearch();
-      }
-    }catch(e){}
+
+// Patch the in-memory package model from a finished task; the backend runs
+// one full reconciliation after the queue drains (onInstalledReconciled).
+function applyInstalledDelta(delta){
+  const id = delta.op === 'add' ? delta.row[1] : delta.id;
+  if(delta.op === 'add'){
+    installedIds.add(id);
+    const row = delta.row.slice();
+    installedPackages = installedPackages.filter(pkg => pkg[1] !== id);
+    installedPackages.push(withHaystack(row));
+    filterInstalledPackages();
+  }else if(delta.op === 'remove'){
+    installedIds.delete(id);
+    installedPackages = installedPackages.filter(pkg => pkg[1] !== id);
+    installedGrid.selected.delete(id);
+    filterInstalledPackages();
+  }else if(delta.op === 'update'){
+    const pkg = installedPackages.find(pkg => pkg[1] === id);
+    if(pkg && delta.version){
+      pkg[2] = delta.version;
+      withHaystack(pkg);
+      installedGrid.updateItem(id);
+    }
+  }
+  if(delta.op !== 'add' && allUpdates.some(pkg => pkg[1] === id)){
+    allUpdates = allUpdates.filter(pkg => pkg[1] !== id);
+    updatesGrid.selected.delete(id);
+    filterUpdates();
+  }
+  searchGrid.updateItem(id);
+}
+
+function onInstalledReconciled(rows){
+  markStale('installed', null);
+  rows = packageRows(rows);
+  if(!rows.length) return;
+  installedIds = new Set(rows.map(r => r[1]));
+  renderInstalledPackages(rows, false);
+  searchGrid.refresh();
+}
+
+function markTaskDirty(id, render = true){
+  dirtyTasks.add(id);
+  if(render) flushTaskViews();
+}
+
+function pushTaskLines(task, lines){
+  task.lines.push(...lines);
+  task.pending.push(...lines);
+  // Trim in slack-sized steps so the ring buffer is not spliced on every line.
+  if(task.lines.length > TASK_LOG_LIMIT * 1.25){
+    const drop = task.lines.length - TASK_LOG_LIMIT;
+    task.lines.splice(0, drop);
+    task.dropped += drop;
+  }
+}
+
+function createTaskView(task){
+  const root = document.createElement('div');
+  root.className = 'p-4 bg-white rounded-lg shadow flex flex-col' + (task.parent ? ' ml-6' : '');
+  root.id = `task-${task.id}`;
+  root.innerHTML = `
+    <div class="flex justify-between items-center mb-2 text-sm">
+      <div><strong>${htmlEscape(task.type.toUpperCase())}</strong> ${htmlEscape(task.pkgid)} <span class="task-queue hidden text-xs text-gray-500 ml-2"></span><span class="task-phase text-xs text-gray-500 ml-2"></span></div>
+      <div>
+        <button onclick="cancelTask('${task.id}')" class="task-cancel bg-red-500 hover:bg-red-700 disabled:opacity-50 text-white px-3 py-1 rounded mr-2">Cancel</button>
+        <button onclick="clearTask('${task.id}')" class="bg-gray-500 hover:bg-gray-700 text-white px-3 py-1 rounded">Clear</button>
+      </div>
+    </div>
+    <div class="task-error hidden text-red-600 font-semibold mb-2">Error occurred</div>
+    <div class="task-bar overflow-hidden h-2 mb-2 text-xs flex rounded">
+      <div class="task-fill shadow-none flex flex-col text-center whitespace-nowrap text-white justify-center transition-all duration-500"></div>
+    </div>
+    <button onclick="loadFullLog('${task.id}')" class="task-more hidden text-xs text-indigo-600 text-left mb-1">Earlier output hidden - load full log</button>
+    <pre class="text-xs font-mono whitespace-pre-wrap max-h-32 overflow-auto"></pre>`;
+  return {
+    root: root,
+    bar: root.querySelector('.task-bar'),
+    fill: root.querySelector('.task-fill'),
+    error: root.querySelector('.task-error'),
+    cancel: root.querySelector('.task-cancel'),
+    more: root.querySelector('.task-more'),
+    queue: root.querySelector('.task-queue'),
+    phase: root.querySelector('.task-phase'),
+    log: root.querySelector('pre'),
+    domLines: 0
+  };
+}
+
+function renderTaskView(task){
+  let view = taskViews[task.id];
+  if(!view){
+    view = taskViews[task.id] = createTaskView(task);
+    slot('tasksGrid').appendChild(view.root);
+  }
+  const barColor = task.status === 'error' ? 'bg-red-200' : task.status === 'success' ? 'bg-green-200' : 'bg-indigo-200';
+  const fillColor = task.status === 'error' ? 'bg-red-600' : task.status === 'success' ? 'bg-green-600' : 'bg-indigo-500';
+  view.bar.classList.remove('bg-red-200', 'bg-green-200', 'bg-indigo-200');
+  view.bar.classList.add(barColor);
+  view.fill.classList.remove('bg-red-600', 'bg-green-600', 'bg-indigo-500');
+  view.fill.classList.add(fillColor);
+  view.fill.classList.toggle('animated-stripes', task.status === 'running');
+  view.fill.style.width = `${Math.min(task.progress ? task.progress : 0, 100)}%`;
+  view.error.classList.toggle('hidden', task.status !== 'error');
+  view.queue.classList.toggle('hidden', task.status !== 'queued');
+  view.queue.textContent = task.queuePos ? `Queued #${task.queuePos}` : 'Queued';
+  view.phase.textContent = task.status === 'running' ? task.progressLabel : '';
+  view.cancel.disabled = !task.procExist;
+  view.more.classList.toggle('hidden', task.dropped === 0 && !task.archived);
+  if(task.pending.length){
+    if(view.domLines + task.pending.length > TASK_LOG_LIMIT * 1.25){
+      view.log.textContent = task.lines.join('\n') + '\n';
+      view.domLines = task.lines.length;
+    }else{
+      view.log.appendChild(document.createTextNode(task.pending.join('\n') + '\n'));
+      view.domLines += task.pending.length;
+    }
+    task.pending = [];
+    view.log.scrollTop = view.log.scrollHeight;
+  }
+}
+
+function flushTaskViews(){
+  dirtyTasks.forEach(id=>{
+    if(tasks[id]) renderTaskView(tasks[id]);
   });
+  dirtyTasks.clear();
 }
+
 function renderTasks() {
-  const container = document.getElementById('tasksGrid');
-  container.innerHTML = '';
-  Object.values(tasks).forEach(task=>{
-    const bars = 'overflow-hidden h-2 mb-2 text-xs flex rounded';
-    const barColor = task.status === 'error'
-      ? 'bg-red-200'
-      : task.status === 'success'
-        ? 'bg-green-200'
-        : 'bg-indigo-200';
-
-    const fillBase = 'shadow-none flex flex-col text-center whitespace-nowrap text-white justify-center transition-all duration-500';
-    const fillColor = task.status === 'error'
-      ? 'bg-red-600'
-      : task.status === 'success'
-        ? 'bg-green-600'
-        : 'bg-indigo-500';
-
-    const errorMsg = task.status === 'error' ? '<div class="text-red-600 font-semibold mb-2">Error occurred</div>' : '';
-    const cancelDisabled = !task.procExist ? 'disabled' : '';
-    let width = Math.min(task.progress ? task.progress : 0, 100);
-
-    let indCls = '';
-    if (task.status === 'running') {
-      indCls = 'animated-stripes';
+  Object.keys(taskViews).forEach(id=>{
+    if(!tasks[id]){
+      taskViews[id].root.remove();
+      delete taskViews[id];
     }
-
-    const html = `<div class="p-4 bg-white rounded-lg shadow flex flex-col" id="task-${task.id}">
-      <div class="flex justify-between items-center mb-2 text-sm">
-        <div><strong>${task.type.toUpperCase()}</strong> ${task.pkgid}</div>
-        <div>
-          <button onclick="cancelTask('${task.id}')" ${cancelDisabled} class="bg-red-500 hover:bg-red-700 disabled:opacity-50 text-white px-3 py-1 rounded mr-2">Cancel</button>
-          <button onclick="clearTask('${task.id}')" class="bg-gray-500 hover:bg-gray-700 text-white px-3 py-1 rounded">Clear</button>
-        </div>
-      </div>
-      ${errorMsg}
-      <div class="${bars} ${barColor}">
-        <div class="${fillBase} ${fillColor} ${indCls}" style="width:${width}%"></div>
-      </div>
-      <pre class="text-xs font-mono whitespace-pre-wrap max-h-32 overflow-auto">${task.message}</pre>
-    </div>`;
-  container.insertAdjacentHTML('beforeend', html);
-  const logEl = container.querySelector(`#task-${task.id} pre`);
-  if (logEl) { logEl.scrollTop = logEl.scrollHeight; }
   });
+  Object.keys(tasks).forEach(id=>dirtyTasks.add(id));
+  flushTaskViews();
 }
 
-function updateTask(id, message, error = false, success = true) {
+function updateTask(id, message, error = false, success = true, render = true) {
   if (!tasks[id]) return;
-  tasks[id].message += message + '\n';
+  pushTaskLines(tasks[id], message.split('\n'));
   if (error) tasks[id].status = 'error';
-  renderTasks();
+  markTaskDirty(id, render);
 }
+const LOG_BLOCK_LINES = 200;
+const LOG_MAX_BLOCKS = 25;
+let logBlock = null;
+let logBlockLines = 0;
+
 function appendLog(line){
-  sidebarLogs.textContent += line + "\n";
-  sidebarLogs.scrollTop = sidebarLogs.scrollHeight;
-  Object.values(tasks).forEach(task=>{
-    if(task.status==='running'){
-      task.message += line + "\n";
+  window.pywebview.api.log_activity(line);
+  appendLogLines([line]);
+}
+// The sidebar only keeps the last LOG_MAX_BLOCKS blocks of lines; each block is
+// appended to and never rewritten. Full history comes from get_activity_log.
+function appendLogLines(lines){
+  const pinned = sidebarLogs.scrollHeight - sidebarLogs.scrollTop - sidebarLogs.clientHeight < 4;
+  let i = 0;
+  while(i < lines.length){
+    if(!logBlock || logBlockLines >= LOG_BLOCK_LINES){
+      logBlock = document.createElement('div');
+      logBlockLines = 0;
+      sidebarLogs.appendChild(logBlock);
+      while(sidebarLogs.children.length > LOG_MAX_BLOCKS){
+        const oldest = sidebarLogs.firstElementChild;
+        const height = oldest.offsetHeight;
+        oldest.remove();
+        if(!pinned) sidebarLogs.scrollTop -= height;
+      }
     }
+    const chunk = lines.slice(i, i + LOG_BLOCK_LINES - logBlockLines);
+    logBlock.appendChild(document.createTextNode(chunk.join("\n") + "\n"));
+    logBlockLines += chunk.length;
+    i += chunk.length;
+  }
+  if(pinned) sidebarLogs.scrollTop = sidebarLogs.scrollHeight;
+}
+function applyTaskEvents(batch){
+  const started = performance.now();
+  batch.added.forEach(([id, type, pkgid, status, parent]) => addTask(id, type, pkgid, false, status, parent));
+  batch.started.forEach(id => {
+    if(!tasks[id] || tasks[id].status !== 'queued') return;
+    tasks[id].status = 'running';
+    tasks[id].queuePos = 0;
+    markTaskDirty(id, false);
   });
-  renderTasks();
+  if(batch.queue){
+    Object.values(tasks).forEach(task => {
+      if(task.status !== 'queued') return;
+      const pos = batch.queue[task.id] || 0;
+      if(pos !== task.queuePos){
+        task.queuePos = pos;
+        markTaskDirty(task.id, false);
+      }
+    });
+  }
+  if(batch.log.length) appendLogLines(batch.log);
+  Object.entries(batch.tasks).forEach(([id, entry]) => {
+    updateTask(id, entry.lines.join('\n'), entry.error, true, false);
+  });
+  Object.entries(batch.progress).forEach(([id, [percent, label]]) => {
+    if(!tasks[id]) return;
+    if(percent !== null) tasks[id].progress = percent;
+    tasks[id].progressLabel = label || '';
+    markTaskDirty(id, false);
+  });
+  batch.finished.forEach(([id, status, message, delta]) => {
+    if(!tasks[id]) return;
+    if(status === 'success') completeTask(id, false, delta);
+    if(status === 'cancelled') tasks[id].status = 'cancelled';
+    tasks[id].procExist = false;
+    updateTask(id, message, status === 'error', status === 'success', false);
+  });
+  flushTaskViews();
+  recordUiTiming('applyTaskEvents', performance.now() - started);
+}
+
+const LOG_PAGE_LINES = 500;
+
+let logPager = null;
+
+function loadFullLog(id){
+  logPager = {title: 'Task Log', fetch: (offset, limit) => window.pywebview.api.get_task_log(id, offset, limit)};
+  pageLog(null);
+}
+function loadActivityLog(){
+  logPager = {title: 'Activity Log', fetch: (offset, limit) => window.pywebview.api.get_activity_log(offset, limit)};
+  pageLog(null);
+}
+
+// Pages come from a log file on the backend, so only one page of a huge log
+// is ever in the DOM.
+async function pageLog(offset){
+  const modal = document.getElementById('detailModal');
+  const content = document.getElementById('detailContent');
+  document.getElementById('detailTitle').textContent = logPager.title;
+  if(modal.classList.contains('hidden')) content.textContent = 'Loading log...';
+  modal.classList.remove('hidden');
+  const page = await logPager.fetch(offset, LOG_PAGE_LINES);
+  const last = page.offset + page.lines.length;
+  const older = Math.max(0, page.offset - LOG_PAGE_LINES);
+  content.innerHTML = `
+    <div class="flex justify-between items-center mb-2 text-xs text-gray-600">
+      <span>Lines ${page.total ? page.offset + 1 : 0}-${last} of ${page.total}</span>
+      <span class="space-x-2">
+        <button class="px-2 py-1 rounded bg-gray-300 disabled:opacity-50" ${page.offset ? '' : 'disabled'} onclick="pageLog(0)">Oldest</button>
+        <button class="px-2 py-1 rounded bg-gray-300 disabled:opacity-50" ${page.offset ? '' : 'disabled'} onclick="pageLog(${older})">Older</button>
+        <button class="px-2 py-1 rounded bg-gray-300 disabled:opacity-50" ${last < page.total ? '' : 'disabled'} onclick="pageLog(${last})">Newer</button>
+        <button class="px-2 py-1 rounded bg-gray-300 disabled:opacity-50" ${last < page.total ? '' : 'disabled'} onclick="pageLog(null)">Newest</button>
+      </span>
+    </div>`;
+  const pre = document.createElement('pre');
+  pre.className = 'text-xs font-mono whitespace-pre-wrap';
+  pre.textContent = page.lines.join('\n');
+  content.appendChild(pre);
+  content.scrollTop = offset === null ? content.scrollHeight : 0;
 }
 
 function cancelTask(id){
@@ -367,79 +2065,264 @@ function cancelTask(id){
   }
   tasks[id].status='cancelled';
   tasks[id].procExist = false;
-  renderTasks();
+  markTaskDirty(id);
 }
 
 function clearTask(id){
   if(!tasks[id]) return;
-  delete tasks[id];
-  renderTasks();
+  const children = Object.values(tasks).filter(task => task.parent === id).map(task => task.id);
+  if(children.some(child => ['queued', 'running'].includes(tasks[child].status))) return;
+  window.pywebview.api.clear_task(id);
+  [id, ...children].forEach(taskId => {
+    delete tasks[taskId];
+    dirtyTasks.delete(taskId);
+    if(taskViews[taskId]){
+      taskViews[taskId].root.remove();
+      delete taskViews[taskId];
+    }
+  });
+}
+
+const mainPanel = document.getElementById('mainPanel');
+const wideLayout = window.matchMedia('(min-width: 768px)');
+const GRID_GAP = 24;
+const OVERSCAN_ROWS = 3;
+const virtualGrids = [];
+
+const cardActions = {
+  install: id => doInstall(id),
+  uninstall: id => doUninstall(id),
+  upgrade: id => doUpgrade(id),
+  details: id => showPackageDetails(id)
+};
+
+// Only the cards inside the scrolled window (plus a few rows of overscan) exist in
+// the DOM; the rest of the grid's height is held by top and bottom padding.
+function createVirtualGrid(containerId, rowHeight, renderCard, emptyText, prefetch = false){
+  const container = slot(containerId);
+  const grid = {container: container, items: [], selected: new Set(), first: -1, last: -1};
+
+  grid.setMessage = function(html){
+    grid.items = [];
+    grid.first = grid.last = -1;
+    container.style.paddingTop = '';
+    container.style.paddingBottom = '';
+    container.innerHTML = html;
+  };
+  grid.setItems = function(items, resetSelection = true){
+    if(resetSelection) grid.selected.clear();
+    if(!items.length){
+      grid.setMessage(`<div class="text-gray-500 italic">${emptyText}</div>`);
+      return;
+    }
+    grid.items = items;
+    grid.refresh();
+  };
+  grid.updateItem = function(id){
+    for(let i = grid.first; i >= 0 && i < grid.last; i++){
+      if(grid.items[i][1] !== id) continue;
+      const node = container.children[i - grid.first];
+      if(node) node.outerHTML = renderCard(grid.items[i], grid.selected.has(id), rowHeight);
+    }
+  };
+  grid.refresh = function(){
+    grid.first = grid.last = -1;
+    grid.render();
+  };
+  grid.render = function(){
+    if(!grid.items.length || container.offsetParent === null) return;
+    const cols = wideLayout.matches ? 2 : 1;
+    const stride = rowHeight + GRID_GAP;
+    const rows = Math.ceil(grid.items.length / cols);
+    const offset = container.getBoundingClientRect().top - mainPanel.getBoundingClientRect().top + mainPanel.scrollTop;
+    const viewTop = mainPanel.scrollTop - offset;
+    const firstRow = Math.max(0, Math.floor(viewTop / stride) - OVERSCAN_ROWS);
+    const lastRow = Math.max(firstRow, Math.min(rows, Math.ceil((viewTop + mainPanel.clientHeight) / stride) + OVERSCAN_ROWS));
+    const first = firstRow * cols;
+    const last = Math.min(grid.items.length, lastRow * cols);
+    if(first === grid.first && last === grid.last) return;
+    const started = performance.now();
+    grid.first = first;
+    grid.last = last;
+    container.style.paddingTop = `${firstRow * stride}px`;
+    container.style.paddingBottom = `${(rows - lastRow) * stride}px`;
+    container.innerHTML = grid.items.slice(first, last)
+      .map(pkg => renderCard(pkg, grid.selected.has(pkg[1]), rowHeight))
+      .join('');
+    recordUiTiming(`render.${containerId}`, performance.now() - started);
+    if(prefetch){
+      const visible = Math.max(0, Math.floor(viewTop / stride)) * cols;
+      schedulePrefetch(grid.items.slice(visible, visible + PREFETCH_VISIBLE).map(pkg => pkg[1]), 400);
+    }
+  };
+
+  container.addEventListener('change', e=>{
+    const box = e.target;
+    if(box.type !== 'checkbox') return;
+    if(box.checked) grid.selected.add(box.value);
+    else grid.selected.delete(box.value);
+  });
+  container.addEventListener('click', e=>{
+    const el = e.target.closest('[data-action]');
+    if(!el || !container.contains(el)) return;
+    cardActions[el.dataset.action](el.dataset.id);
+  });
+  if(prefetch){
+    container.addEventListener('mouseover', e=>{
+      const card = e.target.closest('[data-card-id]');
+      if(card) schedulePrefetch([card.dataset.cardId], 150);
+    });
+  }
+  virtualGrids.push(grid);
+  return grid;
+}
+
+const PREFETCH_VISIBLE = 4;
+let prefetchTimer = 0;
+function schedulePrefetch(ids, delay){
+  clearTimeout(prefetchTimer);
+  prefetchTimer = setTimeout(()=>window.pywebview.api.prefetch_details(ids), delay);
+}
+
+let gridFrame = 0;
+function scheduleGridRender(refresh = false){
+  if(gridFrame) return;
+  gridFrame = requestAnimationFrame(()=>{
+    gridFrame = 0;
+    virtualGrids.forEach(grid => refresh ? grid.refresh() : grid.render());
+  });
+}
+mainPanel.addEventListener('scroll', ()=>scheduleGridRender());
+window.addEventListener('resize', ()=>scheduleGridRender(true));
+wideLayout.addEventListener('change', ()=>scheduleGridRender(true));
+
+function packageRows(results){
+  return results.filter(pkg => Array.isArray(pkg) && pkg[1]);
+}
+
+function searchCard(pkg, checked, height){
+  const id = htmlEscape(pkg[1]);
+  const isInstalled = installedIds.has(pkg[1]);
+  const action = isInstalled ? 'uninstall' : 'install';
+  const btnLabel = isInstalled ? 'Uninstall' : 'Install';
+  const btnClass = isInstalled ? 'bg-red-600 hover:bg-red-700' : 'bg-indigo-600 hover:bg-indigo-700';
+  return `<div class="p-5 bg-gray-50 border border-gray-300 rounded-lg shadow flex flex-col overflow-hidden" style="height:${height}px" data-card-id="${id}">
+      <label class="inline-flex items-center space-x-2 mb-2">
+        <input type="checkbox" class="pkgCheckbox form-checkbox h-5 w-5 text-indigo-600" value="${id}" ${checked ? 'checked' : ''} />
+        <span class="font-medium truncate">${htmlEscape(pkg[0])}</span>
+      </label>
+      <div class="text-sm text-gray-500 mb-1 truncate">ID: ${id}</div>
+      <div class="text-xs mb-1 truncate">Version: ${htmlEscape(pkg[2])}</div>
+      <div class="text-xs mb-3 truncate">Source: ${htmlEscape(pkg[3])}</div>
+      <div class="flex space-x-2 mt-auto">
+        <button class="${btnClass} text-white py-1 px-3 rounded transition" data-action="${action}" data-id="${id}">${btnLabel}</button>
+        <button class="bg-gray-300 hover:bg-gray-400 text-gray-700 py-1 px-3 rounded transition" data-action="details" data-id="${id}">Details</button>
+      </div>
+    </div>`;
+}
+
+function installedCard(pkg, checked, height){
+  const id = htmlEscape(pkg[1]);
+  return `<div class="p-5 bg-white border border-gray-300 rounded-lg shadow flex flex-col overflow-hidden" style="height:${height}px" data-card-id="${id}">
+      <input type="checkbox" class="installedPkgCheckbox" value="${id}" ${checked ? 'checked' : ''} />
+      <div class="font-bold text-lg mb-2 truncate">${htmlEscape(pkg[0])}</div>
+      <div class="text-sm text-gray-500 mb-1 truncate">ID: ${id}</div>
+      <div class="text-xs mb-1 truncate">Version: ${htmlEscape(pkg[2])}</div>
+      <div class="text-xs mb-3 truncate">Source: ${htmlEscape(pkg[3])}</div>
+      <div class="flex space-x-2 mt-auto">
+        <button class="bg-red-600 hover:bg-red-700 text-white py-1 px-3 rounded transition" data-action="uninstall" data-id="${id}">Uninstall</button>
+        <button class="bg-gray-300 hover:bg-gray-400 text-gray-700 py-1 px-3 rounded transition" data-action="details" data-id="${id}">Details</button>
+      </div>
+    </div>`;
+}
+
+function updateCard(pkg, checked, height){
+  const id = htmlEscape(pkg[1]);
+  return `<div class="p-5 bg-gray-50 border border-gray-300 rounded-lg shadow flex flex-col overflow-hidden" style="height:${height}px">
+      <label class="inline-flex items-center space-x-2 mb-2">
+        <input type="checkbox" class="updateCheckbox form-checkbox h-5 w-5 text-indigo-600" value="${id}" ${checked ? 'checked' : ''} />
+        <span class="font-medium truncate">${htmlEscape(pkg[0])}</span>
+      </label>
+      <div class="text-sm text-gray-500 mb-1 truncate">Current Version: ${htmlEscape(pkg[2])}</div>
+      <div class="text-xs mb-3 truncate">Available Version: ${htmlEscape(pkg[3])}</div>
+      <div class="text-xs mb-3 truncate">Source: ${htmlEscape(pkg[4])}</div>
+      <div class="flex space-x-2 mt-auto">
+        <button class="bg-indigo-600 hover:bg-indigo-700 text-white py-1 px-3 rounded transition" data-action="upgrade" data-id="${id}">Upgrade</button>
+      </div>
+    </div>`;
+}
+
+const searchGrid = createVirtualGrid('resultsGrid', 184, searchCard, 'No results found.', true);
+const installedGrid = createVirtualGrid('installedGrid', 212, installedCard, 'No installed packages found.', true);
+const updatesGrid = createVirtualGrid('updatesGrid', 196, updateCard, 'No updates available.');
+let searchResults = [];
+let installedPackages = [];
+
+let searchSeq = 0;
+let searchTimer = null;
+let lastSearch = '';
+
+// Typing filters the current rows at once and starts a real search once the
+// input has been still for SEARCH_DEBOUNCE_MS; the backend kills whatever
+// search was still running.
+function searchInput(){
+  searchFilter();
+  clearTimeout(searchTimer);
+  const q = document.getElementById('searchBox').value.trim().toLowerCase();
+  if(q.length < SEARCH_MIN_CHARS){
+    // Too short to search: stop whatever is still running for the old query.
+    lastSearch = '';
+    window.pywebview.api.winget_search_stream('', ++searchSeq);
+    return;
+  }
+  if(q === lastSearch) return;
+  searchTimer = setTimeout(doSearch, SEARCH_DEBOUNCE_MS);
 }
 
 async function doSearch(){
+  clearTimeout(searchTimer);
   const q = document.getElementById('searchBox').value.trim().toLowerCase();
   if(!q) return;
-  const container = document.getElementById('resultsGrid');
-  container.innerHTML = '<div class="text-gray-500 italic">Searching...</div>';
+  lastSearch = q;
+  const seq = ++searchSeq;
+  searchResults = [];
+  searchGrid.selected.clear();
+  searchGrid.setMessage('<div class="text-gray-500 italic">Searching...</div>');
   try {
-    const raw = await window.pywebview.api.winget_search(q);
-    let results = [];
-    try {
-      results = JSON.parse(raw);
-    } catch(e) {
-      showErrorPopup('Search parse error: '+e.message);
-      return;
-    }
-    renderSearchResults(results);
+    await window.pywebview.api.winget_search_stream(q, seq);
   } catch(e) {
-    container.innerHTML = '<div class="text-red-600">Search failed: ' + e.message + '</div>';
+    searchGrid.setMessage('<div class="text-red-600">Search failed: ' + htmlEscape(e.message) + '</div>');
+  }
+}
+
+// Rows arrive in small batches while winget is still running; results for an
+// older query are dropped once a newer search has started.
+function onSearchResults(seq, rows, done, error){
+  if(seq !== searchSeq) return;
+  if(rows.length){
+    searchResults.push(...packageRows(rows));
+    searchGrid.setItems(searchResults, false);
+  }
+  if(!done) return;
+  if(error){
+    searchGrid.setMessage('<div class="text-red-600">Search failed: ' + htmlEscape(error) + '</div>');
+  }else if(!searchResults.length){
+    searchGrid.setItems([]);
   }
 }
 
 function searchFilter() {
   const filter = document.getElementById('searchBox').value.toLowerCase();
-  const container = document.getElementById('resultsGrid');
-  Array.from(container.children).forEach(card=>{
-    const nameSpan = card.querySelector('label span.font-medium');
-    if(!nameSpan) return;
-    const text = nameSpan.textContent.toLowerCase();
-    card.style.display = text.includes(filter) ? "" : "none";
-  });
+  searchGrid.setItems(searchResults.filter(pkg => pkg[0].toLowerCase().includes(filter)), false);
 }
 
 function renderSearchResults(results){
-  const container = document.getElementById('resultsGrid');
-  container.innerHTML = '';
-  if(!results.length){
-    container.innerHTML = '<div class="text-gray-500 italic">No results found.</div>';
-    return;
-  }
-  results.forEach(pkg=>{
-    const isInstalled = installedIds.has(pkg[1]);
-    const btnLabel = isInstalled ? 'Uninstall' : 'Install';
-    const btnClass = isInstalled ? 'bg-red-600 hover:bg-red-700' : 'bg-indigo-600 hover:bg-indigo-700';
-    const onClickFunc = isInstalled ? `doUninstall('${pkg[1]}')` : `doInstall('${pkg[1]}')`;
-    const card = document.createElement('div');
-    card.className = 'p-5 bg-gray-50 border border-gray-300 rounded-lg shadow flex flex-col';
-    card.innerHTML = `
-      <label class="inline-flex items-center space-x-2 mb-2">
-        <input type="checkbox" class="pkgCheckbox form-checkbox h-5 w-5 text-indigo-600" value="${pkg[1]}" />
-        <span class="font-medium">${pkg[0]}</span>
-      </label>
-      <div class="text-sm text-gray-500 mb-1">ID: ${pkg[1]}</div>
-      <div class="text-xs mb-1">Version: ${pkg[2]}</div>
-      <div class="text-xs mb-3">Source: ${pkg[3]}</div>
-      <div class="flex space-x-2 mt-auto">
-        <button class="${btnClass} text-white py-1 px-3 rounded transition" onclick="${onClickFunc}">${btnLabel}</button>
-        <button class="bg-gray-300 hover:bg-gray-400 text-gray-700 py-1 px-3 rounded transition" onclick="showPackageDetails('${pkg[1]}')">Details</button>
-      </div>`;
-    container.appendChild(card);
-  });
+  searchResults = packageRows(results);
+  searchGrid.setItems(searchResults);
 }
 
 async function loadInstalledPackages(){
-  const container = document.getElementById('installedGrid');
-  container.innerHTML = '<div class="text-gray-500 italic">Loading installed packages...</div>';
+  if(!installedPackages.length) installedGrid.setMessage('<div class="text-gray-500 italic">Loading installed packages...</div>');
   const raw = await window.pywebview.api.winget_list_installed();
   let results = [];
   try {
@@ -449,134 +2332,118 @@ async function loadInstalledPackages(){
     return;
   }
   installedIds = new Set(results.map(r => r[1]));
-  renderInstalledPackages(results);
+  renderInstalledPackages(results, false);
+  markStale('installed', null);
+}
+
+async function setInstalledBackend(value){
+  const settings = await window.pywebview.api.set_setting('installed_backend', value);
+  document.getElementById('installedBackend').value = settings.installed_backend;
+  loadInstalledPackages();
 }
 
 function filterInstalledPackages(){
-  const filter = document.getElementById('packageSearchBox').value.toLowerCase();
-  const container = document.getElementById('installedGrid');
-  Array.from(container.children).forEach(card=>{
-    const text = card.innerText.toLowerCase();
-    card.style.display = text.includes(filter) ? "" : "none";
-  });
+  const filter = inputFilter('packageSearchBox');
+  installedGrid.setItems(installedPackages.filter(pkg => pkg.haystack.includes(filter)), false);
 }
 
-function renderInstalledPackages(packages){
-  const container = document.getElementById('installedGrid');
-  container.innerHTML = '';
-  if(!packages.length){
-    container.innerHTML = '<div class="text-gray-500 italic">No installed packages found.</div>';
-    return;
-  }
-  packages.forEach(pkg=>{
-    const card = document.createElement('div');
-    card.className = 'p-5 bg-white border border-gray-300 rounded-lg shadow flex flex-col';
-    card.innerHTML = `
-      <input type="checkbox" class="installedPkgCheckbox" value="${pkg[1]}" />
-      <div class="font-bold text-lg mb-2">${pkg[0]}</div>
-      <div class="text-sm text-gray-500 mb-1">ID: ${pkg[1]}</div>
-      <div class="text-xs mb-1">Version: ${pkg[2]}</div>
-      <div class="text-xs mb-3">Source: ${pkg[3]}</div>
-      <div class="flex space-x-2 mt-auto">
-        <button class="bg-red-600 hover:bg-red-700 text-white py-1 px-3 rounded transition" onclick="doUninstall('${pkg[1]}')">Uninstall</button>
-        <button class="bg-gray-300 hover:bg-gray-400 text-gray-700 py-1 px-3 rounded transition" onclick="showPackageDetails('${pkg[1]}')">Details</button>
-      </div>`;
-    container.appendChild(card);
-  });
+function withHaystack(pkg){
+  pkg.haystack = pkg.slice(0, 4).join(' ').toLowerCase();
+  return pkg;
 }
 
-async function doInstall(pkgid){
-  await window.pywebview.api.winget_install(pkgid);
+function renderInstalledPackages(packages, resetSelection = true){
+  installedPackages = packageRows(packages).map(withHaystack);
+  const filter = inputFilter('packageSearchBox');
+  installedGrid.setItems(filter ? installedPackages.filter(pkg => pkg.haystack.includes(filter)) : installedPackages, resetSelection);
 }
 
-async function doUninstall(pkgid){
-  await window.pywebview.api.winget_uninstall(pkgid);
+const PRIORITY_INTERACTIVE = 0;
+const PRIORITY_BULK = 10;
+
+async function doInstall(pkgid, priority = PRIORITY_INTERACTIVE){
+  await window.pywebview.api.winget_install(pkgid, priority);
+}
+
+async function doUninstall(pkgid, priority = PRIORITY_INTERACTIVE){
+  await window.pywebview.api.winget_uninstall(pkgid, priority);
 }
 
 async function installSelected(){
-  const checkboxes = document.querySelectorAll('#resultsGrid .pkgCheckbox:checked');
-  const ids = Array.from(checkboxes).map(cb => cb.value);
-  for(const id of ids){
-    await doInstall(id);
+  for(const id of Array.from(searchGrid.selected)){
+    await doInstall(id, PRIORITY_BULK);
   }
 }
 
 async function uninstallSelected(){
-  const checkboxes = document.querySelectorAll('#installedGrid .installedPkgCheckbox:checked');
-  const ids = Array.from(checkboxes).map(cb => cb.value);
-  for(const id of ids){
-    await doUninstall(id);
+  for(const id of Array.from(installedGrid.selected)){
+    await doUninstall(id, PRIORITY_BULK);
   }
 }
 
-async function loadAvailableUpdates(){
-  const container = document.getElementById('updatesGrid');
-  container.innerHTML = '<div class="text-gray-500 italic">Checking for updates...</div>';
+async function setMaxConcurrency(value){
+  const applied = await window.pywebview.api.set_max_concurrency(parseInt(value, 10) || 1);
+  document.getElementById('maxConcurrency').value = applied;
+}
+
+async function loadAvailableUpdates(force = false){
+  if(force || !allUpdates.length) updatesGrid.setMessage('<div class="text-gray-500 italic">Checking for updates...</div>');
   try {
-    const raw = await window.pywebview.api.winget_upgrade_list();
+    const raw = await window.pywebview.api.winget_upgrade_list(force);
     let results = [];
     try {
       results = JSON.parse(raw);
-      allUpdates = results;
+      allUpdates = packageRows(results);
+      updatesGrid.selected.clear();
+      markStale('updates', null);
     } catch(e){
       showErrorPopup('Update list parse error: ' + e.message);
-      container.innerHTML = '<div class="text-red-600">Failed to parse update data.</div>';
+      updatesGrid.setMessage('<div class="text-red-600">Failed to parse update data.</div>');
       return;
     }
-    renderUpdateResults(results);
+    filterUpdates();
   } catch(e){
-    container.innerHTML = '<div class="text-red-600">Failed to load updates: ' + e.message + '</div>';
+    updatesGrid.setMessage('<div class="text-red-600">Failed to load updates: ' + htmlEscape(e.message) + '</div>');
   }
 }
 
-function renderUpdateResults(results){
-  const container = document.getElementById('updatesGrid');
-  container.innerHTML = '';
-  if(!results.length){
-    container.innerHTML = '<div class="text-gray-500 italic">No updates available.</div>';
-    return;
-  }
-  results.forEach(pkg=>{
-    const card = document.createElement('div');
-    card.className = 'p-5 bg-gray-50 border border-gray-300 rounded-lg shadow flex flex-col';
-    card.innerHTML = `
-      <label class="inline-flex items-center space-x-2 mb-2">
-        <input type="checkbox" class="updateCheckbox form-checkbox h-5 w-5 text-indigo-600" value="${pkg[1]}" />
-        <span class="font-medium">${pkg[0]}</span>
-      </label>
-      <div class="text-sm text-gray-500 mb-1">Current Version: ${pkg[2]}</div>
-      <div class="text-xs mb-3">Available Version: ${pkg[3]}</div>
-      <div class="text-xs mb-3">Source: ${pkg[4]}</div>
-      <div class="flex space-x-2 mt-auto">
-        <button class="bg-indigo-600 hover:bg-indigo-700 text-white py-1 px-3 rounded transition" onclick="doUpgrade('${pkg[1]}')">Upgrade</button>
-      </div>`;
-    container.appendChild(card);
-  });
+function onUpdatesVerified(rows){
+  markStale('updates', null);
+  allUpdates = packageRows(rows);
+  const ids = new Set(allUpdates.map(pkg => pkg[1]));
+  updatesGrid.selected.forEach(id => { if(!ids.has(id)) updatesGrid.selected.delete(id); });
+  filterUpdates();
+}
+
+function renderUpdateResults(results, resetSelection = true){
+  updatesGrid.setItems(results, resetSelection);
 }
 
 function filterUpdates(){
-  const filter = document.getElementById('updateSearchBox').value.toLowerCase();
+  const filter = inputFilter('updateSearchBox');
   const filtered = allUpdates.filter(pkg => (pkg[0]).toLowerCase().includes(filter));
-  renderUpdateResults(filtered);
+  renderUpdateResults(filtered, false);
 }
 
-async function doUpgrade(pkgid){
-  await window.pywebview.api.winget_upgrade(pkgid);
-  loadAvailableUpdates();
+async function doUpgrade(pkgid, priority = PRIORITY_INTERACTIVE){
+  await window.pywebview.api.winget_upgrade(pkgid, priority);
 }
 
 async function upgradeSelected(){
-  const checkboxes = document.querySelectorAll('#updatesGrid .updateCheckbox:checked');
-  const ids = Array.from(checkboxes).map(cb => cb.value);
-  for(const id of ids){
-    await doUpgrade(id);
-  }
-  loadAvailableUpdates();
+  const ids = Array.from(updatesGrid.selected);
+  if(!ids.length) return;
+  await window.pywebview.api.winget_upgrade_batch(ids);
+}
+
+async function upgradeAll(){
+  if(!confirm('Upgrade every package with an available update?')) return;
+  await window.pywebview.api.winget_upgrade_all();
 }
 
 async function showPackageDetails(pkgid){
   const modal = document.getElementById('detailModal');
   const content = document.getElementById('detailContent');
+  document.getElementById('detailTitle').textContent = 'Package Details';
   content.textContent = 'Loading package details...';
   modal.classList.remove('hidden');
   try{
@@ -593,35 +2460,228 @@ async function showPackageDetails(pkgid){
   }
 }
 
-function closeDetailModal(){
-  document.getElementById('detailModal').classList.add('hidden');
-  document.getElementById('detailContent').textContent = '';
+function closeDetailModal(){
+  document.getElementById('detailModal').classList.add('hidden');
+  document.getElementById('detailContent').textContent = '';
+}
+
+function renderDetailsHtml(info){
+  if(info.error) return `<div class="text-red-600 font-semibold">Error: ${htmlEscape(info.error)}</div>`;
+  function createCopyButton(value){
+    return `<button class="copy-button" onclick="copyToClipboard('${htmlEscape(value)}')">Copy</button>`;
+  }
+  const keysToShow = ['Id','Version','Description','Installer Url','Homepage','Publisher','Publisher Url','License','License Url','Privacy Url','Release Notes','Publisher Support Url','Purchase Url'];
+  let htmlStr = '';
+  for(let key of keysToShow){
+    if(info[key]){
+      htmlStr += `<div><strong>${htmlEscape(key)}:</strong> ${htmlEscape(info[key])} ${createCopyButton(info[key])}</div>`;
+    }
+  }
+  return htmlStr || '<div>No detailed info available.</div>';
+}
+
+function copyToClipboard(text){
+  navigator.clipboard.writeText(text).then(()=>alert('Copied to clipboard!'), ()=>alert('Failed to copy!'));
+}
+
+function htmlEscape(text){
+  return String(text ?? '').replace(/[&<>"']/g,function(m){return {'&':'&amp;','<':'&lt;','>':'&gt;','"':'&quot;',"'":'&#39;'}[m];});
+}
+
+function onSourcesRefreshed(){
+  if(typeof loadSources === 'function' && !contents.sources.classList.contains('hidden')) loadSources();
+}
+
+function formatAge(seconds){
+  if(seconds === null || seconds === undefined) return 'never';
+  if(seconds < 60) return 'just now';
+  if(seconds < 3600) return `${Math.round(seconds / 60)} min ago`;
+  if(seconds < 86400) return `${Math.round(seconds / 3600)} h ago`;
+  return `${Math.round(seconds / 86400)} d ago`;
+}
+
+function markStale(key, entry){
+  staleData[key] = entry && entry.stale ? entry.age : null;
+  showStale(key);
+}
+
+function showStale(key){
+  const note = document.getElementById(`${key}Stale`);
+  if(!note) return;
+  const age = staleData[key];
+  note.classList.toggle('hidden', age === null || age === undefined);
+  if(age !== null && age !== undefined) note.textContent = `Showing data from ${formatAge(age)} - refreshing...`;
+}
+
+// Paint whatever the last session left behind, then let the backend re-fetch
+// the parts that expired; fresh rows come back through onInstalledReconciled,
+// onUpdatesVerified and onSourcesRefreshed.
+async function restoreState(){
+  const state = await window.pywebview.api.get_state();
+  if(state.installed && !installedPackages.length){
+    installedIds = new Set(packageRows(state.installed.rows).map(r => r[1]));
+    renderInstalledPackages(state.installed.rows);
+    searchGrid.refresh();
+    markStale('installed', state.installed);
+  }
+  if(state.updates && !allUpdates.length){
+    allUpdates = packageRows(state.updates.rows);
+    filterUpdates();
+    markStale('updates', state.updates);
+  }
+  if(state.sources && !knownSources){
+    knownSources = state.sources.rows;
+    markStale('sources', state.sources);
+  }
+  state.tasks.forEach(([id, type, pkgid, status, parent, message, restored]) => {
+    if(tasks[id]) return;
+    addTask(id, type, pkgid, false, status, parent);
+    tasks[id].archived = restored;
+    tasks[id].procExist = status === 'queued' || status === 'running';
+    if(status === 'success') tasks[id].progress = 100;
+    if(message) updateTask(id, message, status === 'error', status === 'success', false);
+  });
+  flushTaskViews();
+  window.pywebview.api.refresh_state();
+}
+if(window.pywebview && window.pywebview.api) restoreState();
+else window.addEventListener('pywebviewready', restoreState, {once: true});
+
+function showErrorPopup(msg) {
+  alert(msg);
+}
+
+</script>
+
+</body>
+</html>
+"""
+
+
+# Markup and scripts for every panel except Search; the page mounts each one the
+# first time its tab is opened so startup only has to build the landing view.
+app_panels = {
+    "packages": {
+        "html": r"""
+  <div class="flex mb-2">
+    <button onclick="uninstallSelected()" class="bg-red-600 text-white px-3 py-1 rounded mr-2">Uninstall Selected</button>
+    <button onclick="auditPackages()" class="bg-gray-600 text-white px-3 py-1 rounded">Details Report</button>
+  </div>
+  <label class="text-sm text-gray-600 mb-2 block">Installed list from
+    <select id="installedBackend" onchange="setInstalledBackend(this.value)" class="ml-2 px-2 py-1 border border-gray-300 rounded">
+      <option value="table">winget list (table)</option>
+      <option value="export">winget export (JSON)</option>
+    </select>
+  </label>
+  <input id="packageSearchBox" oninput="filterInstalledPackages()" placeholder="Search installed packages..."
+    class="mb-4 px-3 py-2 border border-gray-300 rounded w-full" type="search" />
+  <h2 class="text-xl font-semibold mb-4">Installed Packages</h2>
+  <div id="installedStale" class="hidden text-xs text-gray-500 italic mb-2"></div>
+  <div id="installedGrid" data-slot class="grid grid-cols-1 md:grid-cols-2 gap-6"></div>
+""",
+        "script": r"""
+const AUDIT_COLUMNS = ['Version', 'Publisher', 'License', 'Installer Type'];
+let auditRequest = null;
+
+// Runs winget show for the selection (or every listed package) on a pool of
+// backend workers; rows arrive in batches through onBulkDetails.
+async function auditPackages(){
+  const ids = installedGrid.selected.size ? Array.from(installedGrid.selected) : installedGrid.items.map(pkg => pkg[1]);
+  if(!ids.length) return;
+  if(auditRequest) window.pywebview.api.cancel_bulk_show(auditRequest);
+  auditRequest = String(Date.now());
+  document.getElementById('detailTitle').textContent = 'Details Report';
+  document.getElementById('detailContent').innerHTML = `
+    <div class="flex justify-between items-center text-xs text-gray-600">
+      <span id="auditStatus">0 of ${ids.length} packages</span>
+      <span class="space-x-2">
+        <button id="auditCancel" onclick="cancelAudit()" class="px-2 py-1 rounded bg-gray-300">Cancel</button>
+        <button onclick="exportAudit('json')" class="px-2 py-1 rounded bg-gray-300">Export JSON</button>
+        <button onclick="exportAudit('csv')" class="px-2 py-1 rounded bg-gray-300">Export CSV</button>
+      </span>
+    </div>
+    <table class="diag-table"><thead><tr><th>Id</th>${AUDIT_COLUMNS.map(c => `<th>${c}</th>`).join('')}</tr></thead>
+    <tbody id="auditRows"></tbody></table>`;
+  document.getElementById('detailModal').classList.remove('hidden');
+  await window.pywebview.api.bulk_show(ids, auditRequest);
 }
 
-function renderDetailsHtml(info){
-  if(info.error) return `<div class="text-red-600 font-semibold">Error: ${htmlEscape(info.error)}</div>`;
-  function createCopyButton(value){
-    return `<button class="copy-button" onclick="copyToClipboard('${htmlEscape(value)}')">Copy</button>`;
-  }
-  const keysToShow = ['Id','Version','Description','Installer Url','Homepage','Publisher','Publisher Url','License','License Url','Privacy Url','Release Notes','Publisher Support Url','Purchase Url'];
-  let htmlStr = '';
-  for(let key of keysToShow){
-    if(info[key]){
-      htmlStr += `<div><strong>${htmlEscape(key)}:</strong> ${htmlEscape(info[key])} ${createCopyButton(info[key])}</div>`;
-    }
-  }
-  return htmlStr || '<div>No detailed info available.</div>';
+function onBulkDetails(requestId, batch, count, total, done){
+  if(requestId !== auditRequest) return;
+  const body = document.getElementById('auditRows');
+  if(!body) return;
+  body.insertAdjacentHTML('beforeend', batch.map(([id, info, error]) => error
+    ? `<tr><td>${htmlEscape(id)}</td><td colspan="${AUDIT_COLUMNS.length}" class="text-red-600">${htmlEscape(error)}</td></tr>`
+    : `<tr><td>${htmlEscape(id)}</td>${AUDIT_COLUMNS.map(c => `<td>${htmlEscape(info[c])}</td>`).join('')}</tr>`).join(''));
+  document.getElementById('auditStatus').textContent = `${count} of ${total} packages${done ? ' - done' : ''}`;
+  if(done) document.getElementById('auditCancel').disabled = true;
 }
 
-function copyToClipboard(text){
-  navigator.clipboard.writeText(text).then(()=>alert('Copied to clipboard!'), ()=>alert('Failed to copy!'));
+function cancelAudit(){
+  if(auditRequest) window.pywebview.api.cancel_bulk_show(auditRequest);
 }
 
-function htmlEscape(text){
-  return text.replace(/[&<>"']/g,function(m){return {'&':'&amp;','<':'&lt;','>':'&gt;','"':'&quot;',"'":'&#39;'}[m];});
+async function exportAudit(format){
+  if(!auditRequest) return;
+  const result = await window.pywebview.api.export_bulk_details(auditRequest, format);
+  if(result.error) showErrorPopup(result.error);
+  else appendLog(`Exported ${result.count} packages to ${result.path}`);
 }
+""",
+    },
+    "tasks": {
+        "html": r"""
+  <div class="flex justify-between items-center mb-4">
+    <h2 class="text-xl font-semibold">Tasks</h2>
+    <label class="text-sm text-gray-600">Run at once
+      <input id="maxConcurrency" type="number" min="1" max="8" value="2" onchange="setMaxConcurrency(this.value)"
+        class="ml-2 w-16 px-2 py-1 border border-gray-300 rounded" />
+    </label>
+  </div>
+  <div id="tasksGrid" data-slot class="space-y-4"></div>
+""",
+        "script": "",
+    },
+    "updates": {
+        "html": r"""
+  <div class="max-w-4xl mx-auto">
+    <div class="flex space-x-2 mb-6">
+      <input id="updateSearchBox" type="search" placeholder="Search available updates..."
+        class="flex-1 px-4 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-indigo-500" oninput="filterUpdates()" />
+      <button onclick="loadAvailableUpdates(true)"
+        class="bg-indigo-600 hover:bg-indigo-700 text-white px-3 py-1 rounded ml-2 transition">Refresh</button>
+    </div>
+    <div class="flex mb-4">
+      <button onclick="upgradeSelected()" class="bg-indigo-600 text-white px-3 py-1 rounded mr-2">Upgrade Selected</button>
+      <button onclick="upgradeAll()" class="bg-indigo-600 text-white px-3 py-1 rounded mr-2">Upgrade All</button>
+    </div>
+    <div id="updatesStale" class="hidden text-xs text-gray-500 italic mb-2"></div>
+    <div id="updatesGrid" data-slot class="grid grid-cols-1 md:grid-cols-2 gap-6"></div>
+  </div>
+""",
+        "script": "",
+    },
+    "sources": {
+        "html": r"""
+  <div class="flex space-x-2 mb-4">
+    <input id="sourceName" type="text" placeholder="Source name" class="px-2 py-1 border rounded w-32" />
+    <input id="sourceArg" type="text" placeholder="Source URL/Path" class="px-2 py-1 border rounded w-64" />
+    <input id="sourceType" type="text" placeholder="(Optional) Type" class="px-2 py-1 border rounded w-32" />
+    <button onclick="handleSourceForm()" id="sourceFormBtn" class="bg-green-600 hover:bg-green-700 text-white px-3 py-1 rounded">Add</button>
+    <button onclick="resetSourceForm()" id="sourceResetBtn" class="bg-gray-400 hover:bg-gray-600 text-white px-3 py-1 rounded hidden">Cancel Edit</button>
+  </div>
+  <div class="flex justify-between items-center mb-4">
+    <h2 class="text-xl font-semibold">Sources</h2>
+    <button onclick="refreshSourcesNow()" class="bg-indigo-600 hover:bg-indigo-700 text-white px-3 py-1 rounded transition">Refresh now</button>
+  </div>
+  <div id="sourcesStale" class="hidden text-xs text-gray-500 italic mb-2"></div>
+  <div id="sourcesGrid" class="grid grid-cols-1 md:grid-cols-2 gap-6"></div>
+""",
+        "script": r"""
+let editingSourceOrigName = null;
 
 async function loadSources(){
+  if(knownSources) renderSources(knownSources);
   const raw = await window.pywebview.api.winget_list_sources();
   let results = [];
   try {
@@ -630,6 +2690,8 @@ async function loadSources(){
     showErrorPopup('Source list parse error: ' + e.message + '\n' + raw);
     return;
   }
+  knownSources = results;
+  markStale('sources', null);
   renderSources(results);
 }
 
@@ -647,6 +2709,8 @@ function renderSources(sources){
       <div class="font-bold text-lg mb-1">${src.Name}</div>
       <div class="text-xs mb-1"><b>Type:</b> ${src.Type || ""}</div>
       <div class="text-xs mb-1"><b>URL:</b> ${src.Arg || ""}</div>
+      <div class="text-xs mb-1 text-gray-500">Refreshed: ${formatAge(src.RefreshedAgo)}</div>
+      ${src.RefreshError ? `<div class="text-xs mb-1 text-red-600">Last refresh failed: ${htmlEscape(src.RefreshError)}</div>` : ''}
       <div class="flex space-x-2 mt-4">
         <button class="bg-red-600 hover:bg-red-700 text-white py-1 px-2 rounded transition" onclick="deleteSource('${src.Name}')">Delete</button>
         <button class="bg-indigo-600 hover:bg-indigo-700 text-white py-1 px-2 rounded transition" onclick="editSourcePrompt('${src.Name}','${src.Arg}','${src.Type || ""}')">Edit</button>
@@ -698,239 +2762,1068 @@ function resetSourceForm(){
 }
 window.resetSourceForm = resetSourceForm;
 
-function showErrorPopup(msg) {
-  alert(msg);
+async function refreshSourcesNow(){
+  await window.pywebview.api.refresh_sources();
+  appendLog('Refreshing sources in the background...');
 }
+""",
+    },
+    "diagnostics": {
+        "html": r"""
+  <div class="flex justify-between items-center mb-4">
+    <h2 class="text-xl font-semibold">Diagnostics</h2>
+    <button onclick="loadDiagnostics()" class="bg-indigo-600 hover:bg-indigo-700 text-white px-3 py-1 rounded transition">Refresh</button>
+  </div>
+  <div id="diagnosticsCounters" class="text-sm text-gray-600 mb-4"></div>
+  <h2 class="text-lg font-semibold mb-2">Backend operations</h2>
+  <div class="p-4 bg-white rounded-lg shadow mb-6 overflow-auto">
+    <table class="diag-table">
+      <thead><tr><th>Operation</th><th>Count</th><th>p50 ms</th><th>p95 ms</th><th>Max ms</th><th>TTFB p50</th><th>Parse p50</th><th>Bytes p50</th><th>Wait p50</th><th>Latency</th></tr></thead>
+      <tbody id="diagnosticsOps"></tbody>
+    </table>
+  </div>
+  <h2 class="text-lg font-semibold mb-2">Page rendering</h2>
+  <div class="p-4 bg-white rounded-lg shadow overflow-auto">
+    <table class="diag-table">
+      <thead><tr><th>Step</th><th>Count</th><th>p50 ms</th><th>p95 ms</th><th>Max ms</th><th>Latency</th></tr></thead>
+      <tbody id="diagnosticsUi"></tbody>
+    </table>
+  </div>
+""",
+        "script": r"""
+const DIAGNOSTICS_REFRESH_MS = 2000;
+let diagnosticsTimer = 0;
 
-</script>
+async function loadDiagnostics(){
+  clearTimeout(diagnosticsTimer);
+  const metrics = await window.pywebview.api.get_metrics();
+  const counters = metrics.counters;
+  document.getElementById('diagnosticsCounters').textContent =
+    `evaluate_js calls: ${counters['evaluate_js.calls'] || 0} · bytes sent to page: ${formatBytes(counters['evaluate_js.bytes'] || 0)}`;
 
-</body>
-</html>
-"""
+  const rows = Object.entries(metrics.ops).sort(([a], [b]) => a.localeCompare(b)).map(([op, entry]) => {
+    const f = entry.fields;
+    const stat = (name, key) => f[name] ? f[name][key] : '';
+    return `<tr><td>${htmlEscape(op)}</td><td>${entry.count}</td>
+      <td>${stat('total_ms', 'p50')}</td><td>${stat('total_ms', 'p95')}</td><td>${stat('total_ms', 'max')}</td>
+      <td>${stat('ttfb_ms', 'p50')}</td><td>${stat('parse_ms', 'p50')}</td>
+      <td>${f.bytes ? formatBytes(f.bytes.p50) : f.payload_bytes ? formatBytes(f.payload_bytes.p50) : ''}</td>
+      <td>${stat('wait_ms', 'p50')}</td><td>${histogramHtml(entry.histogram, metrics.buckets_ms)}</td></tr>`;
+  });
+  document.getElementById('diagnosticsOps').innerHTML = rows.join('') || '<tr><td colspan="10">No operations recorded yet.</td></tr>';
+
+  const uiRows = Object.entries(uiTimings).sort(([a], [b]) => a.localeCompare(b)).map(([name, series]) => {
+    const sorted = series.samples.slice().sort((a, b) => a - b);
+    const pick = q => sorted[Math.min(sorted.length - 1, Math.floor(sorted.length * q))].toFixed(2);
+    const histogram = new Array(metrics.buckets_ms.length + 1).fill(0);
+    sorted.forEach(ms => histogram[metrics.buckets_ms.filter(edge => ms > edge).length]++);
+    return `<tr><td>${htmlEscape(name)}</td><td>${series.count}</td><td>${pick(0.5)}</td><td>${pick(0.95)}</td>
+      <td>${sorted[sorted.length - 1].toFixed(2)}</td><td>${histogramHtml(histogram, metrics.buckets_ms)}</td></tr>`;
+  });
+  document.getElementById('diagnosticsUi').innerHTML = uiRows.join('') || '<tr><td colspan="6">Nothing rendered yet.</td></tr>';
+
+  if(!contents.diagnostics.classList.contains('hidden')){
+    diagnosticsTimer = setTimeout(loadDiagnostics, DIAGNOSTICS_REFRESH_MS);
+  }
+}
+
+function histogramHtml(counts, edges){
+  const peak = Math.max(1, ...counts);
+  return `<div class="diag-histogram">${counts.map((n, i) => {
+    const label = i < edges.length ? `≤ ${edges[i]} ms` : `> ${edges[edges.length - 1]} ms`;
+    return `<div style="height:${Math.round(n / peak * 100)}%" title="${label}: ${n}"></div>`;
+  }).join('')}</div>`;
+}
+
+function formatBytes(n){
+  if(n >= 1048576) return `${(n / 1048576).toFixed(1)} MB`;
+  if(n >= 1024) return `${(n / 1024).toFixed(1)} KB`;
+  return `${n} B`;
+}
+""",
+    },
+}
 
 
 class Api:
-    def __init__(self):
+    def __init__(self, data_dir=None, max_concurrent=2):
         self.window = None
+        self._listeners = []
         self.tasks = {}
         self.procs = {}
+        self._data_dir = data_dir or _app_data_dir()
+        self._store = StateStore(os.path.join(self._data_dir, "state.db"))
+        legacy_cache = os.path.join(self._data_dir, "catalog-cache.json")
+        if os.path.exists(legacy_cache):
+            self._store.import_json_cache(legacy_cache)
+        self._cache = CatalogCache(self._store)
+        self._settings_path = os.path.join(self._data_dir, "settings.json")
+        self._settings = self._load_settings()
+        self._metrics = Metrics(os.environ.get("WINGET_UI_METRICS") or self._settings["metrics_file"] or None)
+        self._runner = CommandRunner(metrics=self._metrics)
+        self._search_requests = {}
+        self._search_gates = {}
+        self._index = SearchIndex()
+        self._task_log_dir = os.path.join(self._data_dir, "task-logs")
+        threading.Thread(target=_purge_task_logs, args=(self._task_log_dir,), daemon=True).start()
+        self._activity = TaskLog(os.path.join(self._task_log_dir, f"activity-{os.getpid()}.log"))
+        self._restore_tasks()
+        self._pump = EventPump(self._emit_task_events, history=self._activity)
+        self._scheduler = TaskScheduler(
+            max_concurrent, on_change=self._pump.queue, on_idle=self._schedule_reconcile, metrics=self._metrics
+        )
+        self._reconcile_pending = False
+        self._reconcile_timer = None
+        self._upgrades_verified_at = 0.0
+        self._verifying_upgrades = False
+        self._sources = SourceRefresher(
+            os.path.join(self._data_dir, "source-state.json"),
+            self._source_rows,
+            self._update_source,
+            lambda: self._scheduler.is_idle() and not self._runner.active(),
+            on_refreshed=self._sources_refreshed,
+        )
+        self._details = LRUCache()
+        self._details_inflight = {}
+        self._details_lock = threading.Lock()
+        self._prefetch_queue = deque(maxlen=32)
+        self._bulk = OrderedDict()
+        self._prefetch_workers = 0
+        self.max_prefetch_workers = 1
+        threading.Thread(target=self._seed_search_index, daemon=True).start()
 
     def set_window(self, window):
         self.window = window
 
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    def _emit_task_events(self, batch):
+        if batch["finished"]:
+            finished_at = time.time()
+            rows = []
+            for task_id, status, message, _ in batch["finished"]:
+                task = self.tasks.get(task_id)
+                if task is None:
+                    continue
+                task["message"] = message
+                task["log"].flush()
+                rows.append((task_id, task.get("parent"), task["type"], task["pkgid"], status, message, finished_at))
+            self._store.record_tasks(rows)
+        if batch["log"]:
+            self._activity.flush()
+        self._push_js("applyTaskEvents", batch)
+
+    def _restore_tasks(self):
+        self._store.prune_tasks(time.time() - TASK_LOG_RETENTION)
+        rows = self._store.recent_tasks()
+        ids = {row[0] for row in rows}
+        for task_id, parent, kind, pkgid, status, message in rows:
+            task = {
+                "type": kind, "pkgid": pkgid, "status": status, "message": message, "procExist": False, "restored": True,
+                "log": TaskLog(os.path.join(self._task_log_dir, f"{task_id}.log"), existing=True),
+            }
+            if parent in ids:
+                task["parent"] = parent
+            self.tasks[task_id] = task
+        for task_id, task in self.tasks.items():
+            if "parent" in task:
+                self.tasks[task["parent"]].setdefault("children", []).append(task_id)
+
+    def get_state(self):
+        tasks = dict(self.tasks)
+        state = {"tasks": []}
+        for task_id, task in tasks.items():
+            if task.get("parent"):
+                continue
+            # Children follow their batch so the page can nest them under it.
+            for row_id in [task_id] + [c for c in task.get("children", []) if c in tasks]:
+                row = tasks[row_id]
+                state["tasks"].append([
+                    row_id, row["type"], row["pkgid"], row["status"], row.get("parent"), row.get("message"), row.get("restored", False)
+                ])
+        for name, command in (("installed", "list"), ("updates", "upgrade"), ("sources", "source")):
+            entry = self._cache.stale(command)
+            if entry is None:
+                state[name] = None
+                continue
+            age, rows = entry
+            if command == "source":
+                rows = [dict(source, **self._sources.status(source["Name"])) for source in rows]
+            state[name] = {"rows": rows, "age": round(age), "stale": age > self._cache.ttls[command]}
+        return state
+
+    def refresh_state(self):
+        threading.Thread(target=self._refresh_state, daemon=True).start()
+        return True
+
+    def _refresh_state(self):
+        # Whatever get_state handed out is re-fetched where it expired and pushed
+        # back through the same callbacks the incremental updates use.
+        self.warm_caches()
+        installed = self._cache.get("list")
+        if installed:
+            self._push_js("onInstalledReconciled", installed)
+        updates = self._cache.get("upgrade")
+        if updates is not None:
+            self._push_js("onUpdatesVerified", updates)
+        self._push_js("onSourcesRefreshed")
+
+    def _evaluate_js(self, script):
+        if not self.window:
+            return
+        started = time.perf_counter()
+        self.window.evaluate_js(script)
+        self._metrics.count("evaluate_js.calls")
+        self._metrics.count("evaluate_js.bytes", len(script))
+        self._metrics.record(
+            f"js.{script.split('(', 1)[0]}",
+            total_ms=round((time.perf_counter() - started) * 1000, 2),
+            payload_bytes=len(script),
+        )
+
+    def _reply(self, op, value, started):
+        began = time.perf_counter()
+        payload = json.dumps(value)
+        self._metrics.record(
+            f"api.{op}",
+            total_ms=round((time.perf_counter() - started) * 1000, 2),
+            serialize_ms=round((time.perf_counter() - began) * 1000, 2),
+            payload_bytes=len(payload),
+            rows=len(value) if isinstance(value, list) else None,
+        )
+        return payload
+
+    def _push_js(self, function, *args):
+        for listener in self._listeners:
+            listener(function, args)
+        if self.window:
+            self._evaluate_js(f"{function}({', '.join(json.dumps(a) for a in args)})")
+
+    def get_panel(self, name):
+        panel = app_panels.get(name)
+        if panel is None:
+            return {"html": f"<div class=\"text-red-600\">Unknown panel: {name}</div>", "script": ""}
+        return panel
+
+    def report_timing(self, name, ms):
+        ms = round(float(ms), 1)
+        self._metrics.record(f"ui.{name}", total_ms=ms)
+        if name == "interactive":
+            print(f"Window interactive after {ms} ms")
+
+    def get_metrics(self):
+        return self._metrics.summary()
+
+    def get_event_stats(self):
+        return self._pump.stats()
+
+    def _load_settings(self):
+        settings = dict(DEFAULT_SETTINGS)
+        try:
+            with open(self._settings_path, encoding="utf-8") as f:
+                settings.update({k: v for k, v in json.load(f).items() if k in DEFAULT_SETTINGS})
+        except (OSError, ValueError):
+            pass
+        return settings
+
+    def get_settings(self):
+        return dict(self._settings)
+
+    def set_setting(self, name, value):
+        if name not in DEFAULT_SETTINGS:
+            raise ValueError(f"Unknown setting {name}")
+        if name == "installed_backend" and value not in INSTALLED_BACKENDS:
+            raise ValueError(f"Unknown installed backend {value}")
+        self._settings[name] = value
+        if name == "installed_backend":
+            self._cache.invalidate("list")
+        if name == "metrics_file" and not os.environ.get("WINGET_UI_METRICS"):
+            self._metrics.path = value or None
+        try:
+            os.makedirs(self._data_dir, exist_ok=True)
+            with open(self._settings_path, "w", encoding="utf-8") as f:
+                json.dump(self._settings, f, indent=2)
+        except OSError as e:
+            print(f"Failed to write settings {self._settings_path}: {e}")
+        return self.get_settings()
+
+    def _seed_search_index(self):
+        for args, stored_at, rows in self._cache.entries("search"):
+            self._index.add(rows, query=args[0], at=stored_at)
+
     def clean_and_split_winget_output(self, lines):
         return clean_and_split_winget_output(lines)
 
     def clean_and_split_winget_upgrade_output(self, lines):
         return clean_and_split_winget_upgrade_output(lines)
 
-    def winget_search(self, query):
+    def _run(self, kind, args, parse, key=None, check=False):
+        return self._runner.run(args, parse, COMMAND_TIMEOUTS[kind], key, check)
+
+    def _cached(self, command, args, produce, force=False):
+        if not force:
+            cached = self._cache.get(command, args)
+            if cached is not None:
+                return cached
+        value = produce()
+        if value:
+            self._cache.put(command, args, value)
+        return value
+
+    def _local_search(self, key):
+        if self._index.covers(key):
+            # Stand in for winget exactly: every substring hit, and nothing else,
+            # so a query with no hits still goes to the CLI.
+            hits = self._index.search(key, limit=None, exact=True)
+            if hits:
+                return hits
+        return self._cache.get("search", [key])
+
+    def winget_search(self, query, force=False):
         if not query:
             return "[]"
+        started = time.perf_counter()
+        key = query.strip().lower()
+        if not force:
+            hits = self._local_search(key)
+            if hits:
+                return self._reply("search", hits, started)
+
+        def produce():
+            rows = self._run("search", ["search", query], lambda lines: list(iter_winget_table(lines, WINGET_SEARCH_FIELDS)))
+            self._index.add(rows, query=key)
+            self._remember_versions((row[1], row[2]) for row in rows)
+            return rows
+
         try:
-            completed = subprocess.run(
-                ["winget", "search", query],
-                capture_output=True,
-                text=True,
-                shell=True,
-            )
-            lines = completed.stdout.splitlines()
-            parsed = self.clean_and_split_winget_output(lines)
-            return json.dumps(parsed)
+            parsed = self._cached("search", [key], produce, force)
+            return self._reply("search", parsed, started)
         except Exception as e:
             self.show_error(str(e))
             return json.dumps([{"error": str(e)}])
 
-    def winget_list_installed(self):
+    def winget_search_stream(self, query, request_id, force=False, client="local"):
+        # Searches are tracked per client, so a query typed in one daemon
+        # client never supersedes one still running for another.
+        key = query.strip().lower()
+        self._search_requests[client] = request_id
+        if self._runner.cancel(f"search:{client}"):
+            self._metrics.count("search.superseded")
+        hits = None if force or not key else self._local_search(key)
+        if not key or hits:
+            self._push_js("onSearchResults", request_id, hits or [], True, None, client)
+            return True
+        threading.Thread(target=self._stream_search, args=(query, key, request_id, client), daemon=True).start()
+        return True
+
+    def _stream_search(self, query, key, request_id, client):
+        rows = []
+        pending = []
+        lock = threading.Lock()
+        finished = threading.Event()
+
+        def flush(done=False, error=None):
+            with lock:
+                batch = pending[:]
+                del pending[:]
+            if not superseded() and (batch or done):
+                self._push_js("onSearchResults", request_id, batch, done, error, client)
+
+        def flush_loop():
+            while not finished.wait(SEARCH_BATCH_SECONDS):
+                flush()
+
+        def superseded():
+            return self._search_requests.get(client) != request_id
+
+        # At most one winget search runs at a time per client. Queries typed
+        # while the previous one was being killed collapse into the newest one.
+        with self._search_gates.setdefault(client, threading.Lock()):
+            if superseded():
+                return
+            threading.Thread(target=flush_loop, daemon=True).start()
+            lines = self._runner.stream(["search", query], COMMAND_TIMEOUTS["search"], key=f"search:{client}", superseded=superseded)
+            try:
+                for row in iter_winget_table(lines, WINGET_SEARCH_FIELDS):
+                    if superseded():
+                        return
+                    rows.append(row)
+                    with lock:
+                        pending.append(row)
+                    if len(rows) == 1:
+                        flush()
+            except CommandCancelled:
+                return
+            except Exception as e:
+                finished.set()
+                flush(True, str(e))
+                return
+            finally:
+                finished.set()
+                lines.close()
+        self._index.add(rows, query=key)
+        self._remember_versions((row[1], row[2]) for row in rows)
+        if rows:
+            self._cache.put("search", [key], rows)
+        flush(True)
+
+    def warm_caches(self):
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = {
+                "installed": pool.submit(self.winget_list_installed),
+                "updates": pool.submit(self.winget_upgrade_list),
+                "sources": pool.submit(self.winget_list_sources),
+            }
+            return {name: len(json.loads(future.result())) for name, future in futures.items()}
+
+    def winget_list_installed(self, force=False):
+        started = time.perf_counter()
         try:
-            completed = subprocess.run(
-                ["winget", "list"],
-                capture_output=True,
-                text=True,
-                shell=True,
+            parsed = self._cached(
+                "list",
+                [],
+                self._installed_from_export
+                if self._settings["installed_backend"] == "export"
+                else self._installed_from_table,
+                force,
             )
-            lines = completed.stdout.splitlines()
-            parsed = self.clean_and_split_winget_output(lines)
-            return json.dumps(parsed)
+            return self._reply("list", parsed, started)
         except Exception as e:
             self.show_error(str(e))
             return json.dumps([{"error": str(e)}])
 
-    def winget_show(self, pkgid):
+    def _installed_from_table(self):
+        rows = self._run("list", ["list"], self.clean_and_split_winget_output)
+        if rows:
+            self._cache.put("names", [], rows)
+        return rows
+
+    def _installed_from_export(self):
+        os.makedirs(self._data_dir, exist_ok=True)
+        fd, path = tempfile.mkstemp(prefix="winget-export-", suffix=".json", dir=self._data_dir)
+        os.close(fd)
         try:
-            completed = subprocess.run(
-                ["winget", "show", "--id", pkgid],
-                capture_output=True,
-                text=True,
-                shell=True,
-            )
-            info = parse_winget_show_output(completed.stdout)
-            return json.dumps(info)
+            self._run("list", ["export", "-o", path, "--include-versions", "--accept-source-agreements"], "".join)
+            with open(path, encoding="utf-8-sig") as f:
+                exported = parse_winget_export(json.load(f))
+        finally:
+            os.remove(path)
+        table_rows = self._cache.get("names")
+        if table_rows is not None:
+            merged = merge_installed_snapshot(exported, table_rows)
+            # Names come from the last table scrape; only rescrape when the
+            # export contains packages installed since then.
+            if all(row[0] != row[1] for row in merged[:len(exported)]):
+                return merged
+        return merge_installed_snapshot(exported, self._installed_from_table())
+
+    def winget_show(self, pkgid, version=None):
+        started = time.perf_counter()
+        try:
+            return self._reply("show", self._get_details(pkgid, version), started)
         except Exception as e:
             return json.dumps({"error": str(e)})
 
-    def winget_upgrade_list(self):
+    def _get_details(self, pkgid, version=None, stream_key=None):
+        key = (pkgid, version or "")
+        while True:
+            info = self._details.get(key)
+            if info is not None:
+                return info
+            info = self._cache.get("show", list(key))
+            if info is not None:
+                self._details.put(key, info)
+                return info
+            with self._details_lock:
+                pending = self._details_inflight.get(key)
+                if pending is None:
+                    pending = self._details_inflight[key] = threading.Event()
+                    break
+            # A prefetch for this id is already running; its result lands in the cache.
+            pending.wait()
         try:
-            completed = subprocess.run(
-                ["winget", "upgrade", "--accept-source-agreements"],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                shell=True,
+            args = ["show", "--id", pkgid] + (["--version", version] if version else [])
+            if stream_key is None:
+                info = self._run("show", args, parse_winget_show_output)
+            else:
+                # Bulk jobs bring their own worker threads, so they stream
+                # directly instead of queueing on the shared runner pool.
+                lines = self._runner.stream(args, COMMAND_TIMEOUTS["show"], key=stream_key)
+                try:
+                    info = parse_winget_show_output(lines)
+                finally:
+                    lines.close()
+            if info:
+                self._details.put(key, info)
+                self._cache.put("show", list(key), info)
+                if not version and info.get("Version"):
+                    self._remember_versions([(pkgid, info["Version"])])
+            return info
+        finally:
+            with self._details_lock:
+                del self._details_inflight[key]
+            pending.set()
+
+    def bulk_show(self, pkgids, request_id, workers=BULK_SHOW_WORKERS):
+        pkgids = list(dict.fromkeys(p for p in pkgids if p))
+        job = {"ids": pkgids, "results": {}, "errors": {}, "cancelled": False, "done": False}
+        with self._details_lock:
+            self._bulk[request_id] = job
+            for old_id, old in list(self._bulk.items()):
+                if len(self._bulk) <= BULK_SHOW_KEEP:
+                    break
+                if old["done"]:
+                    del self._bulk[old_id]
+        workers = max(1, min(int(workers), BULK_SHOW_MAX_WORKERS))
+        threading.Thread(target=self._bulk_show, args=(request_id, job, workers), daemon=True).start()
+        return len(pkgids)
+
+    def _bulk_show(self, request_id, job, workers):
+        pending = []
+        lock = threading.Lock()
+        finished = threading.Event()
+        started = time.perf_counter()
+
+        def flush(done=False):
+            with lock:
+                batch = pending[:]
+                del pending[:]
+                count = len(job["results"]) + len(job["errors"])
+            if batch or done:
+                self._push_js("onBulkDetails", request_id, batch, count, len(job["ids"]), done)
+
+        def flush_loop():
+            while not finished.wait(SEARCH_BATCH_SECONDS):
+                flush()
+
+        def fetch(pkgid):
+            if job["cancelled"]:
+                return
+            try:
+                info = self._get_details(pkgid, stream_key=f"bulk:{request_id}:{pkgid}")
+                error = None if info else "No details returned"
+            except CommandCancelled:
+                return
+            except Exception as e:
+                info, error = None, str(e)
+            with lock:
+                if error:
+                    job["errors"][pkgid] = error
+                else:
+                    job["results"][pkgid] = info
+                pending.append([pkgid, info, error])
+
+        threading.Thread(target=flush_loop, daemon=True).start()
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="winget-show") as pool:
+                list(pool.map(fetch, job["ids"]))
+        finally:
+            job["done"] = True
+            finished.set()
+            flush(True)
+            self._metrics.record(
+                "api.bulk_show",
+                total_ms=round((time.perf_counter() - started) * 1000, 2),
+                packages=len(job["ids"]),
+                errors=len(job["errors"]),
+                workers=workers,
             )
-            print(completed.stdout)
-            if completed.returncode != 0:
-                return json.dumps([])
-            lines = completed.stdout.splitlines()
-            print(lines)
-            parsed = self.clean_and_split_winget_upgrade_output(lines)
-            return json.dumps(parsed)
+
+    def cancel_bulk_show(self, request_id):
+        job = self._bulk.get(request_id)
+        if not job or job["done"]:
+            return False
+        job["cancelled"] = True
+        for pkgid in job["ids"]:
+            self._runner.cancel(f"bulk:{request_id}:{pkgid}")
+        return True
+
+    def export_bulk_details(self, request_id, fmt="json", path=None):
+        job = self._bulk.get(request_id)
+        if not job:
+            return {"error": "No details to export"}
+        if fmt not in ("json", "csv"):
+            return {"error": f"Unknown export format: {fmt}"}
+        rows = []
+        for pkgid in job["ids"]:
+            if pkgid in job["results"]:
+                rows.append({"Id": pkgid, **job["results"][pkgid]})
+            elif pkgid in job["errors"]:
+                rows.append({"Id": pkgid, "Error": job["errors"][pkgid]})
+        if not path:
+            folder = os.path.join(os.path.expanduser("~"), "Downloads")
+            if not os.path.isdir(folder):
+                folder = self._data_dir
+            path = os.path.join(folder, time.strftime(f"winget-details-%Y%m%d-%H%M%S.{fmt}"))
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            if fmt == "json":
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump(rows, f, indent=2, ensure_ascii=False)
+            else:
+                columns = list(dict.fromkeys(["Id"] + [key for row in rows for key in row if key != "Error"]))
+                if job["errors"]:
+                    columns.append("Error")
+                with open(path, "w", encoding="utf-8-sig", newline="") as f:
+                    writer = csv.DictWriter(f, fieldnames=columns)
+                    writer.writeheader()
+                    writer.writerows(rows)
+        except OSError as e:
+            return {"error": f"Failed to write {path}: {e}"}
+        return {"path": path, "count": len(rows)}
+
+    def prefetch_details(self, pkgids):
+        with self._details_lock:
+            for pkgid in pkgids:
+                key = (pkgid, "")
+                if key in self._details_inflight or key in self._prefetch_queue or key in self._details:
+                    continue
+                self._prefetch_queue.append(key)
+            start = min(len(self._prefetch_queue), self.max_prefetch_workers - self._prefetch_workers)
+            self._prefetch_workers += max(start, 0)
+        for _ in range(start):
+            threading.Thread(target=self._prefetch_worker, daemon=True).start()
+        return True
+
+    def _prefetch_worker(self):
+        while True:
+            with self._details_lock:
+                if not self._prefetch_queue:
+                    self._prefetch_workers -= 1
+                    return
+                # Newest first: the card under the pointer matters more than older hovers.
+                pkgid, version = self._prefetch_queue.pop()
+            try:
+                self._get_details(pkgid, version)
+            except Exception as e:
+                print(f"Prefetch of {pkgid} failed: {e}")
+
+    def _remember_versions(self, pairs):
+        catalog = dict(self._cache.get("catalog") or {})
+        changed = False
+        for pkgid, version in pairs:
+            if (pkgid and not pkgid.endswith("\u2026") and version and parse_version(version) is not None
+                    and catalog.get(pkgid) != version):
+                catalog[pkgid] = version
+                changed = True
+        if changed:
+            self._cache.put("catalog", [], catalog)
+
+    def _local_upgrades(self):
+        installed = self._cache.get("list") or self._cache.get("names")
+        catalog = self._cache.get("catalog")
+        if not installed or not catalog:
+            return None
+        # A catalog built from a few searches says nothing about the packages it
+        # has never seen; only answer locally once it knows every installed
+        # package winget could upgrade. Truncated ids are matched if possible
+        # but cannot hold the answer back.
+        if any(
+            upgradable(row) and not row[1].endswith("\u2026") and row[1] not in catalog for row in installed
+        ):
+            return None
+        return compute_upgrades(installed, catalog)
+
+    def _winget_upgrades(self):
+        # A failed run lists nothing; it must not be cached as "no upgrades".
+        rows = self._run(
+            "upgrade", ["upgrade", "--accept-source-agreements"], self.clean_and_split_winget_upgrade_output, check=True
+        )
+        self._upgrades_verified_at = time.time()
+        # winget's answer is authoritative: listed packages are at "Available",
+        # everything else installed is already at the newest catalog version.
+        installed = self._cache.get("list") or self._cache.get("names") or []
+        listed = {row[1] for row in rows}
+        self._remember_versions(
+            [(row[1], row[3]) for row in rows] + [(row[1], row[2]) for row in installed if row[1] not in listed]
+        )
+        return rows
+
+    def _schedule_upgrade_check(self):
+        if self._verifying_upgrades or time.time() - self._upgrades_verified_at <= UPGRADE_VERIFY_INTERVAL:
+            return False
+        self._verifying_upgrades = True
+        threading.Thread(target=self._verify_upgrades, daemon=True).start()
+        return True
+
+    def _verify_upgrades(self):
+        try:
+            rows = self._winget_upgrades()
+        except Exception as e:
+            print(f"Background upgrade check failed: {e}")
+            return
+        finally:
+            self._verifying_upgrades = False
+        if rows:
+            self._cache.put("upgrade", [], rows)
+        self._push_js("onUpdatesVerified", rows)
+
+    def winget_upgrade_list(self, force=False):
+        started = time.perf_counter()
+        try:
+            parsed = None if force else self._cache.get("upgrade")
+            if parsed is None and not force:
+                parsed = self._local_upgrades()
+                if parsed is not None:
+                    self._cache.put("upgrade", [], parsed)
+                    self._schedule_upgrade_check()
+            if parsed is None:
+                parsed = self._winget_upgrades()
+                if parsed:
+                    self._cache.put("upgrade", [], parsed)
+            return self._reply("upgrade", parsed, started)
         except Exception as e:
             self.show_error(str(e))
             return json.dumps([])
 
-    def winget_install(self, pkgid):
-        task_id = str(uuid.uuid4())
-        self.tasks[task_id] = {"type": "install", "pkgid": pkgid, "status": "running", "message": "", "procExist": True}
-        if self.window:
-            self.window.evaluate_js(f"appendLog('Started install task {task_id} for {pkgid}')")
-            self.window.evaluate_js(f"addTask('{task_id}', 'install', '{pkgid}')")
+    def winget_install(self, pkgid, priority=PRIORITY_INTERACTIVE):
+        return self._enqueue_task(
+            "install",
+            pkgid,
+            ["install", "-e", "--id", pkgid, "--accept-source-agreements", "--accept-package-agreements"],
+            priority,
+        )
 
-        proc = subprocess.Popen(
-            [
-                "winget",
-                "install",
-                "-e",
-                "--id",
-                pkgid,
-                "--accept-source-agreements",
-                "--accept-package-agreements",
-            ],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            bufsize=1,
-            text=True,
-            shell=True,
-            creationflags=subprocess.CREATE_NEW_PROCESS_GROUP,
+    def winget_uninstall(self, pkgid, priority=PRIORITY_INTERACTIVE):
+        return self._enqueue_task(
+            "uninstall",
+            pkgid,
+            ["uninstall", "--id", pkgid, "--accept-source-agreements"],
+            priority,
+        )
+
+    def winget_upgrade(self, pkgid, priority=PRIORITY_INTERACTIVE):
+        return self._enqueue_task(
+            "upgrade",
+            pkgid,
+            ["upgrade", "-e", "--id", pkgid, "--accept-source-agreements", "--accept-package-agreements"],
+            priority,
         )
-        self.procs[task_id] = proc
-        threading.Thread(target=self.collect_output, args=(task_id, proc), daemon=True).start()
-        return True
 
-    def winget_uninstall(self, pkgid):
+    def _task_log(self, task_id):
+        return TaskLog(os.path.join(self._task_log_dir, f"{task_id}.log"))
+
+    def _enqueue_task(self, kind, pkgid, args, priority):
+        existing = self._scheduler.find((kind, pkgid))
+        if existing:
+            self._pump.log(f"{kind.capitalize()} of {pkgid} is already queued as task {existing}")
+            return existing
         task_id = str(uuid.uuid4())
-        self.tasks[task_id] = {"type": "uninstall", "pkgid": pkgid, "status": "running", "message": "", "procExist": True}
-        if self.window:
-            self.window.evaluate_js(f"appendLog('Started uninstall task {task_id} for {pkgid}')")
-            self.window.evaluate_js(f"addTask('{task_id}', 'uninstall', '{pkgid}')")
+        self.tasks[task_id] = {"type": kind, "pkgid": pkgid, "status": "queued", "log": self._task_log(task_id), "procExist": True}
+        self._pump.log(f"Queued {kind} task {task_id} for {pkgid}")
+        self._pump.add_task(task_id, kind, pkgid, "queued")
+        return self._scheduler.submit(task_id, (kind, pkgid), lambda: self._run_task(task_id, args), priority)
 
-        proc = subprocess.Popen(
-            [
-                "winget",
-                "uninstall",
-                "--id",
-                pkgid,
-                "--accept-source-agreements",
-            ],
+    def _start_task(self, task_id):
+        task = self.tasks[task_id]
+        task["status"] = "running"
+        self._pump.log(f"Started {task['type']} task {task_id} for {task['pkgid']}")
+        self._pump.started(task_id)
+
+    def _spawn_task_process(self, args):
+        return subprocess.Popen(
+            ["winget"] + args,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
-            bufsize=1,
-            text=True,
-            shell=True,
-            creationflags=subprocess.CREATE_NEW_PROCESS_GROUP,
+            **_popen_options(),
         )
+
+    def _run_task(self, task_id, args):
+        self._start_task(task_id)
+        try:
+            proc = self._spawn_task_process(args)
+        except Exception as e:
+            self.tasks[task_id]["status"] = "error"
+            self._pump.finish(task_id, "error", f"Exception occurred: {e}")
+            self.show_error(f"Exception occurred: {str(e)}")
+            return
         self.procs[task_id] = proc
-        threading.Thread(target=self.collect_output, args=(task_id, proc), daemon=True).start()
-        return True
-    
+        self.collect_output(task_id, proc)
+
+    def winget_upgrade_batch(self, pkgids, priority=PRIORITY_BULK):
+        pkgids = list(dict.fromkeys(pkgids))
+        if not pkgids:
+            return None
+        key = ("upgrade-batch",) + tuple(sorted(pkgids))
+        return self._enqueue_batch(key, f"{len(pkgids)} packages", pkgids, priority)
+
+    def winget_upgrade_all(self, priority=PRIORITY_BULK):
+        return self._enqueue_batch(("upgrade-all",), "all packages", None, priority)
+
+    def _enqueue_batch(self, key, label, pkgids, priority):
+        existing = self._scheduler.find(key)
+        if existing:
+            return existing
+        task_id = str(uuid.uuid4())
+        self.tasks[task_id] = {
+            "type": "upgrade", "pkgid": label, "status": "queued", "log": self._task_log(task_id), "procExist": True, "children": []
+        }
+        self._pump.log(f"Queued upgrade task {task_id} for {label}")
+        self._pump.add_task(task_id, "upgrade", label, "queued")
+        for pkgid in pkgids or ():
+            self._add_child_task(task_id, pkgid)
+        if pkgids:
+            run = lambda: self._run_upgrade_batch(task_id)
+        else:
+            run = lambda: self._run_upgrade_all(task_id)
+        return self._scheduler.submit(task_id, key, run, priority)
+
+    def _add_child_task(self, parent_id, pkgid, status="queued"):
+        child_id = str(uuid.uuid4())
+        self.tasks[child_id] = {
+            "type": "upgrade", "pkgid": pkgid, "status": status, "log": self._task_log(child_id), "procExist": True, "parent": parent_id
+        }
+        self.tasks[parent_id]["children"].append(child_id)
+        self._pump.add_task(child_id, "upgrade", pkgid, status, parent_id)
+        return child_id
+
+    def _run_upgrade_batch(self, task_id):
+        self._start_task(task_id)
+        batch = self.tasks[task_id]
+        errors = []
+        try:
+            for child_id in list(batch["children"]):
+                child = self.tasks[child_id]
+                if batch["status"] == "cancelled" or child["status"] == "cancelled":
+                    child["status"] = "cancelled"
+                    self._pump.finish(child_id, "cancelled", "Skipped")
+                    continue
+                self._start_task(child_id)
+                proc = self._spawn_task_process(
+                    ["upgrade", "-e", "--id", child["pkgid"], "--accept-source-agreements", "--accept-package-agreements"]
+                )
+                self.procs[task_id] = self.procs[child_id] = proc
+                child_errors, code = self._stream_task_output(child_id, proc)
+                errors.extend(self._finish_child_task(task_id, child_id, child_errors.get(child_id, []), code))
+        except Exception as e:
+            errors.append(f"Exception occurred: {e}")
+        self._finish_batch_task(task_id, errors)
+
+    def _run_upgrade_all(self, task_id):
+        self._start_task(task_id)
+        routed_errors = {}
+        current = [task_id]
+
+        def route(line):
+            # winget prints "(2/5) Found Name [Id] Version x" before each package it upgrades.
+            found = UPGRADE_FOUND.match(line)
+            if found:
+                if current[0] != task_id:
+                    self._finish_child_task(task_id, current[0], routed_errors.get(current[0], []))
+                self.tasks[task_id]["expected"] = int(found.group(2))
+                current[0] = self._add_child_task(task_id, found.group(4), "running")
+                self._pump.started(current[0])
+            return current[0]
+
+        errors = []
+        try:
+            proc = self._spawn_task_process(
+                ["upgrade", "--all", "--accept-source-agreements", "--accept-package-agreements"]
+            )
+            self.procs[task_id] = proc
+            _, code = self._stream_task_output(task_id, proc, route, routed_errors)
+            last = current[0]
+            errors = [line for target, lines in routed_errors.items() if target != last for line in lines]
+            # winget exits non-zero when any package in the run failed. Pin that on
+            # the last package only if nothing else can explain it; otherwise it
+            # belongs to the batch.
+            if last != task_id:
+                own = routed_errors.get(last, [])
+                earlier_failed = any(
+                    self.tasks[c]["status"] == "error" for c in self.tasks[task_id]["children"] if c != last
+                )
+                blame_last = bool(own) or not earlier_failed
+                errors.extend(self._finish_child_task(task_id, last, own, code if blame_last else 0))
+                if code and not blame_last and self.tasks[task_id]["status"] != "cancelled":
+                    errors.append(f"winget exited with code {code}")
+            elif self.tasks[task_id]["status"] != "cancelled":
+                errors.extend(routed_errors.get(task_id) or ([f"winget exited with code {code}"] if code else []))
+        except Exception as e:
+            errors.append(f"Exception occurred: {e}")
+        self._finish_batch_task(task_id, errors)
+
+    def _finish_child_task(self, parent_id, child_id, errors, code=0):
+        child = self.tasks[child_id]
+        if child["status"] == "cancelled" or self.tasks[parent_id]["status"] == "cancelled":
+            status, message, errors = "cancelled", "Cancelled", []
+        elif errors or code:
+            status, message = "error", "Error occurred"
+            errors = errors or [f"{child['pkgid']}: winget exited with code {code}"]
+        else:
+            status, message = "success", "Upgraded successfully"
+        child["status"] = status
+        delta = self._apply_installed_delta("upgrade", child["pkgid"]) if status == "success" else None
+        self._pump.finish(child_id, status, message, delta)
+        children = self.tasks[parent_id]["children"]
+        total = max(len(children), self.tasks[parent_id].get("expected", 0))
+        done = sum(1 for c in children if self.tasks[c]["status"] in ("success", "error", "cancelled"))
+        line = f"({done}/{total}) {child['pkgid']}: {status}"
+        self.tasks[parent_id]["log"].append(line)
+        self._pump.task_line(parent_id, line, bool(errors))
+        self._pump.progress(parent_id, round(done * 100 / total), f"{done}/{total} packages")
+        return errors
+
+    def _finish_batch_task(self, task_id, errors):
+        batch = self.tasks[task_id]
+        children = [self.tasks[c] for c in batch["children"]]
+        upgraded = sum(1 for c in children if c["status"] == "success")
+        summary = f"Upgraded {upgraded} of {len(children)} packages"
+        if batch["status"] == "cancelled":
+            self._pump.finish(task_id, "cancelled", summary)
+        elif errors:
+            batch["status"] = "error"
+            self._pump.finish(task_id, "error", summary)
+            self.show_error("\n".join(errors))
+        else:
+            batch["status"] = "success"
+            self._pump.finish(task_id, "success", summary)
+            self._pump.log("Task process ended successfully.")
+
+    def set_max_concurrency(self, value):
+        self._scheduler.set_max_concurrent(value)
+        return self._scheduler.max_concurrent
+
+    def get_queue(self):
+        return {"max_concurrent": self._scheduler.max_concurrent, "positions": self._scheduler.positions()}
+
+    def _apply_installed_delta(self, kind, pkgid):
+        self._reconcile_pending = True
+        if kind == "install":
+            known = self._index.get(pkgid)
+            row = [known[0], pkgid, known[2], known[3]] if known else [pkgid, pkgid, "", ""]
+            self._cache.patch("list", [], lambda rows: [r for r in rows if r[1] != pkgid] + [row])
+            return {"op": "add", "row": row}
+        if kind == "uninstall":
+            self._cache.patch("list", [], lambda rows: [r for r in rows if r[1] != pkgid])
+            self._cache.patch("upgrade", [], lambda rows: [r for r in rows if r[1] != pkgid])
+            return {"op": "remove", "id": pkgid}
+        if kind == "upgrade":
+            update = next((r for r in self._cache.get("upgrade") or [] if r[1] == pkgid), None)
+            version = update[3] if update else ""
+            if version:
+                self._cache.patch("list", [], lambda rows: [r[:2] + [version] + r[3:] if r[1] == pkgid else r for r in rows])
+            self._cache.patch("upgrade", [], lambda rows: [r for r in rows if r[1] != pkgid])
+            return {"op": "update", "id": pkgid, "version": version}
+        return None
+
+    def _schedule_reconcile(self):
+        # Deltas keep the page current while tasks run; one real listing
+        # afterwards catches anything they could not know (new names, side effects).
+        if not self._reconcile_pending:
+            return
+        if self._reconcile_timer:
+            self._reconcile_timer.cancel()
+        self._reconcile_timer = threading.Timer(RECONCILE_DELAY_SECONDS, self._reconcile_installed)
+        self._reconcile_timer.daemon = True
+        self._reconcile_timer.start()
+
+    def _reconcile_installed(self):
+        if not self._scheduler.is_idle():
+            return
+        self._reconcile_pending = False
+        rows = json.loads(self.winget_list_installed(force=True))
+        self._push_js("onInstalledReconciled", rows)
+
+    def _stream_task_output(self, task_id, proc, route=None, errors=None):
+        errors = {} if errors is None else errors
+        progress = {}
+        target = task_id
+        for kind, value in iter_task_output(proc.stdout):
+            if kind == "progress":
+                self._report_progress(progress, target, value[0], value[1])
+                continue
+            stripped = value
+            if stripped:
+                self._pump.log(stripped)
+            target = route(stripped) if route else task_id
+            phase = installer_phase(stripped)
+            if phase:
+                self._report_progress(progress, target, None, None, phase)
+
+            lower_line = stripped.lower()
+            is_error_line = any(k in lower_line for k in ERROR_KEYWORDS)
+            if is_error_line:
+                errors.setdefault(target, []).append(stripped)
+
+            self.tasks[target]["log"].append(stripped)
+            self._pump.task_line(target, stripped, is_error_line)
+        proc.stdout.close()
+        return errors, proc.wait()
+
+    def _report_progress(self, progress, target, percent, detail, phase=None):
+        state = progress.setdefault(target, {"at": 0.0, "phase": None, "percent": None})
+        now = time.monotonic()
+        changed = phase is not None and phase != state["phase"]
+        if phase is not None:
+            state["phase"] = phase
+        if percent is not None:
+            state["percent"] = percent
+        # Redraws arrive far faster than anyone can read them; pass one on per
+        # interval, plus phase changes and the final 100%.
+        if not changed and percent != 100 and now - state["at"] < PROGRESS_INTERVAL_SECONDS:
+            return
+        state["at"] = now
+        label = " ".join(part for part in (state["phase"], detail) if part)
+        self._pump.progress(target, state["percent"], label)
+
     def collect_output(self, task_id, proc):
-      keywords = ['fail', 'cannot find', 'error', 'no installed package found']
-      error_output = []
-      error_detected = False
       try:
-          for line in iter(proc.stdout.readline, ""):
-              if not line:
-                  break
-              if self.window:
-                  escaped_line = json.dumps(line.strip())
-                  if escaped_line.strip() and not "-" in escaped_line.strip() and not escaped_line.strip() == " ":
-                      print(str(escaped_line.strip()))
-                      self.window.evaluate_js(f"appendLog({escaped_line})")
-
-                  lower_line = line.lower()
-                  is_error_line = any(k in lower_line for k in keywords)
-                  if is_error_line:
-                      error_detected = True
-                      error_output.append(line.strip())
-
-                  self.window.evaluate_js(f"updateTask('{task_id}', {escaped_line}, {str(is_error_line).lower()})")
-
-          proc.stdout.close()
-          proc.wait()
-
-          if error_detected:
-              error_message = "\n".join(error_output)
-              self.window.evaluate_js(f"updateTask('{task_id}', 'Error occurred', true, false)")
-              self.show_error(error_message)
+          errors, code = self._stream_task_output(task_id, proc)
+          error_output = errors.get(task_id)
+          task = self.tasks[task_id]
+
+          # Only a clean exit counts: a killed or failed winget must not be
+          # patched into the installed list as if it had worked.
+          if task["status"] == "cancelled":
+              self._pump.finish(task_id, "cancelled", "Cancelled")
+          elif error_output or code:
+              task["status"] = "error"
+              self._pump.finish(task_id, "error", "Error occurred")
+              self.show_error("\n".join(error_output or [f"winget exited with code {code}"]))
           else:
-              self.window.evaluate_js(f"completeTask('{task_id}')")
-              self.window.evaluate_js(f"updateTask('{task_id}', 'Task completed successfully', false, true)")
-              self.window.evaluate_js(f"appendLog('Task process ended successfully.')")
+              task["status"] = "success"
+              delta = self._apply_installed_delta(task["type"], task["pkgid"])
+              self._pump.finish(task_id, "success", "Task completed successfully", delta)
+              self._pump.log("Task process ended successfully.")
       except Exception as e:
-          self.window.evaluate_js(f"updateTask('{task_id}', 'Exception occurred: {json.dumps(str(e))}', true, false)")
+          self.tasks[task_id]["status"] = "error"
+          self._pump.finish(task_id, "error", f"Exception occurred: {e}")
           self.show_error(f"Exception occurred: {str(e)}")
 
+    def start_background_refresh(self):
+        self._sources.start()
 
-    def winget_upgrade(self, pkgid):
-        task_id = str(uuid.uuid4())
-        self.tasks[task_id] = {"type": "upgrade", "pkgid": pkgid, "status": "running", "message": "", "procExist": True}
-        if self.window:
-            self.window.evaluate_js(f"appendLog('Started upgrade task {task_id} for {pkgid}')")
-            self.window.evaluate_js(f"addTask('{task_id}', 'upgrade', '{pkgid}')")
+    def refresh_sources(self):
+        self._sources.start()
+        self._sources.wake()
+        return True
 
-        proc = subprocess.Popen(
-            [
-                "winget",
-                "upgrade",
-                "-e",
-                "--id",
-                pkgid,
-                "--accept-source-agreements",
-                "--accept-package-agreements",
-            ],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            bufsize=1,
-            text=True,
-            shell=True,
-            creationflags=subprocess.CREATE_NEW_PROCESS_GROUP,
+    def _update_source(self, name):
+        output = self._run("source", ["source", "update", "--name", name], "".join)
+        failed = [line.strip() for line in output.splitlines() if any(k in line.lower() for k in ERROR_KEYWORDS)]
+        if failed:
+            raise RuntimeError(failed[0])
+
+    def _sources_refreshed(self):
+        self._push_js("onSourcesRefreshed")
+        # New catalog data can mean new upgrades; the periodic background check
+        # picks them up and pushes them through onUpdatesVerified.
+        self._schedule_upgrade_check()
+
+    def _source_rows(self, force=False):
+        return self._cached(
+            "source",
+            [],
+            lambda: self._run("source", ["source", "list"], clean_and_split_winget_source_output),
+            force,
         )
-        self.procs[task_id] = proc
-        threading.Thread(target=self.collect_output, args=(task_id, proc), daemon=True).start()
-        return True
 
-    def winget_list_sources(self):
+    def winget_list_sources(self, force=False):
+        started = time.perf_counter()
         try:
-            completed = subprocess.run(
-                ["winget", "source", "list"],
-                capture_output=True,
-                text=True,
-                shell=True,
-            )
-            lines = completed.stdout.splitlines()
-            sources = []
-            for line in lines:
-                if not line.strip() or set(line.strip()) <= {"-"} or line.strip().startswith("Name "):
-                    continue
-                parts = line.strip().split()
-                if len(parts) >= 2:
-                    source = {"Name": parts[0], "Arg": parts[1]}
-                    if len(parts) > 2:
-                        source["Type"] = parts[2]
-                    else:
-                        source["Type"] = ""
-                    sources.append(source)
-            return json.dumps(sources)
+            sources = [dict(source, **self._sources.status(source["Name"])) for source in self._source_rows(force)]
+            return self._reply("source", sources, started)
         except Exception as e:
             self.show_error(str(e))
             return json.dumps([])
@@ -938,54 +3831,335 @@ class Api:
     def winget_add_source(self, name, arg, typ=""):
         try:
             cmd = [
-                "winget", "source", "add",
+                "source", "add",
                 "--name", name,
                 arg,
                 "--accept-source-agreements"
             ]
             if typ:
                 cmd += ["--type", typ]
-            completed = subprocess.run(cmd, capture_output=True, text=True, shell=True)
-            return completed.stdout
+            output = self._run("source", cmd, "".join)
+            self._cache.invalidate("source", "search", "upgrade")
+            return output
         except Exception as e:
             self.show_error(str(e))
             return str(e)
 
     def winget_delete_source(self, name):
         try:
-            cmd = ["winget", "source", "remove", "--name", name, "--accept-source-agreements"]
-            completed = subprocess.run(cmd, capture_output=True, text=True, shell=True)
-            return completed.stdout
+            cmd = ["source", "remove", "--name", name, "--accept-source-agreements"]
+            output = self._run("source", cmd, "".join)
+            self._cache.invalidate("source", "search", "upgrade")
+            return output
         except Exception as e:
             self.show_error(str(e))
             return str(e)
 
+    def get_task_log(self, task_id, offset=None, limit=TASK_LOG_PAGE):
+        task = self.tasks.get(task_id)
+        if not task:
+            return {"offset": 0, "total": 0, "lines": []}
+        offset, total, lines = task["log"].read(offset, max(1, min(int(limit), 10 * TASK_LOG_PAGE)))
+        return {"offset": offset, "total": total, "lines": lines}
+
+    def get_activity_log(self, offset=None, limit=TASK_LOG_PAGE):
+        offset, total, lines = self._activity.read(offset, max(1, min(int(limit), 10 * TASK_LOG_PAGE)))
+        return {"offset": offset, "total": total, "lines": lines}
+
+    def log_activity(self, line):
+        self._activity.append(str(line))
+
+    def clear_task(self, task_id):
+        task = self.tasks.get(task_id)
+        if not task or task["status"] in ("queued", "running"):
+            return False
+        children = [c for c in task.get("children", []) if c in self.tasks]
+        if any(self.tasks[c]["status"] in ("queued", "running") for c in children):
+            return False
+        for child_id in children:
+            self.tasks.pop(child_id)["log"].delete()
+        self.tasks.pop(task_id)["log"].delete()
+        self._store.delete_tasks([task_id] + children)
+        return True
+
     def cancel_task(self, task_id):
+        task = self.tasks.get(task_id)
+        if task and task.get("parent") and task["status"] == "queued":
+            task["status"] = "cancelled"
+            return True
+        if task and task.get("children") and task["status"] == "running":
+            task["status"] = "cancelled"
+        if self._scheduler.cancel(task_id):
+            self.tasks[task_id]["status"] = "cancelled"
+            self._pump.log(f"Removed task {task_id} from the queue")
+            # A batch that never started will not skip its children itself.
+            for child_id in task.get("children", []):
+                child = self.tasks[child_id]
+                if child["status"] in ("queued", "running"):
+                    child["status"] = "cancelled"
+                    self._pump.finish(child_id, "cancelled", "Skipped")
+            return True
         proc = self.procs.get(task_id)
         if not proc:
             return False
         try:
-            proc.send_signal(signal.CTRL_BREAK_EVENT)
-            t_wait = 6
-            for _ in range(t_wait * 10):
-                if proc.poll() is not None:
-                    return True
-                time.sleep(0.1)
-            if proc.poll() is None:
-                proc.terminate()
+            if IS_WINDOWS:
+                proc.send_signal(signal.CTRL_BREAK_EVENT)
+            else:
+                os.killpg(proc.pid, signal.SIGTERM)
+            # Give winget a chance to roll back cleanly before killing it outright.
+            timer = threading.Timer(CANCEL_GRACE_SECONDS, _kill_process_tree, (proc,))
+            timer.daemon = True
+            timer.start()
+            task["status"] = "cancelled"
             return True
         except Exception as e:
             print(f"Failed to cancel task {task_id}: {e}")
             return False
 
     def show_error(self, message):
-        if self.window:
-            escaped = json.dumps(message)
-            self.window.evaluate_js(f"showErrorPopup({escaped})")
+        self._pump.flush()
+        self._push_js("showErrorPopup", message)
 
 
-if __name__ == "__main__":
+# The methods the UI calls; nothing else on Api is reachable over JSON-RPC.
+RPC_METHODS = (
+    "get_state", "refresh_state", "get_panel", "report_timing", "get_metrics", "get_event_stats",
+    "get_settings", "set_setting",
+    "winget_search", "winget_search_stream", "winget_list_installed", "winget_show",
+    "prefetch_details", "bulk_show", "cancel_bulk_show", "export_bulk_details",
+    "winget_upgrade_list", "winget_install", "winget_uninstall", "winget_upgrade",
+    "winget_upgrade_batch", "winget_upgrade_all", "set_max_concurrency", "get_queue",
+    "refresh_sources", "winget_list_sources", "winget_add_source", "winget_delete_source",
+    "get_task_log", "get_activity_log", "log_activity", "clear_task", "cancel_task",
+)
+
+
+class EventLog:
+    def __init__(self, size=DAEMON_EVENT_BACKLOG):
+        self._cond = threading.Condition()
+        self._events = deque(maxlen=size)
+        self.seq = 0
+
+    def __call__(self, function, args):
+        with self._cond:
+            self.seq += 1
+            self._events.append({"seq": self.seq, "event": function, "args": list(args)})
+            self._cond.notify_all()
+
+    def wait(self, after, timeout):
+        with self._cond:
+            self._cond.wait_for(lambda: self.seq > after, timeout)
+            return [event for event in self._events if event["seq"] > after]
+
+
+class _RpcHandler(BaseHTTPRequestHandler):
+    server_version = "winget-ui"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _authorized(self):
+        if self.headers.get("Authorization") == f"Bearer {self.server.token}":
+            return True
+        self.send_error(401)
+        return False
+
+    def _send_json(self, value):
+        body = json.dumps(value).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if self.path != "/rpc":
+            self.send_error(404)
+            return
+        if not self._authorized():
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        except ValueError as e:
+            self._send_json({"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": str(e)}})
+            return
+        if isinstance(request, list):
+            self._send_json([self.server.dispatch(item) for item in request])
+        else:
+            self._send_json(self.server.dispatch(request))
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        if url.path != "/events":
+            self.send_error(404)
+            return
+        if not self._authorized():
+            return
+        query = urllib.parse.parse_qs(url.query)
+        after = int(query["after"][0]) if "after" in query else self.server.events.seq
+        # One JSON object per line, for as long as the client stays connected;
+        # blank lines are heartbeats so dead connections get noticed.
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("X-Event-Seq", str(after))
+        self.end_headers()
+        try:
+            while True:
+                events = self.server.events.wait(after, DAEMON_HEARTBEAT_SECONDS)
+                for event in events:
+                    self.wfile.write(json.dumps(event).encode("utf-8") + b"\n")
+                    after = event["seq"]
+                if not events:
+                    self.wfile.write(b"\n")
+                self.wfile.flush()
+        except OSError:
+            pass
+
+
+class ApiDaemon(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, api, host=DAEMON_HOST, port=DAEMON_PORT, token=None):
+        super().__init__((host, port), _RpcHandler)
+        self.api = api
+        self.token = token or secrets.token_urlsafe(24)
+        self.events = EventLog()
+        api.add_listener(self.events)
+
+    def dispatch(self, request):
+        request_id = request.get("id") if isinstance(request, dict) else None
+        method = request.get("method") if isinstance(request, dict) else None
+        if method not in RPC_METHODS:
+            return {"jsonrpc": "2.0", "id": request_id, "error": {"code": -32601, "message": f"Unknown method {method}"}}
+        params = request.get("params") or []
+        try:
+            result = getattr(self.api, method)(**params) if isinstance(params, dict) else getattr(self.api, method)(*params)
+        except TypeError as e:
+            return {"jsonrpc": "2.0", "id": request_id, "error": {"code": -32602, "message": str(e)}}
+        except Exception as e:
+            return {"jsonrpc": "2.0", "id": request_id, "error": {"code": -32000, "message": str(e)}}
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    def write_discovery(self, path):
+        host, port = self.server_address[:2]
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"url": f"http://{host}:{port}", "token": self.token, "pid": os.getpid()}, f)
+
+
+def _daemon_discovery_path(data_dir=None):
+    return os.path.join(data_dir or _app_data_dir(), "daemon.json")
+
+
+def run_daemon(host=DAEMON_HOST, port=DAEMON_PORT):
     api = Api()
+    server = ApiDaemon(api, host, port)
+    discovery = _daemon_discovery_path()
+    server.write_discovery(discovery)
+    threading.Thread(target=api.warm_caches, daemon=True).start()
+    api.start_background_refresh()
+    print(f"Serving winget Api on {host}:{server.server_address[1]} (token in {discovery})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        try:
+            os.remove(discovery)
+        except OSError:
+            pass
+
+
+class RemoteApi:
+    # Stands in for Api inside the window when a daemon owns the real one; every
+    # RPC method is forwarded and the daemon's event stream is replayed as JS.
+    def __init__(self, url, token):
+        self.window = None
+        self._url = url
+        self._token = token
+        self._ids = itertools.count(1)
+        self._client = secrets.token_hex(8)
+
+    @classmethod
+    def from_discovery(cls, path=None):
+        with open(path or _daemon_discovery_path(), encoding="utf-8") as f:
+            info = json.load(f)
+        return cls(info["url"], info["token"])
+
+    def _request(self, path, data=None, timeout=None):
+        request = urllib.request.Request(
+            self._url + path,
+            data=data,
+            headers={"Authorization": f"Bearer {self._token}", "Content-Type": "application/json"},
+        )
+        return urllib.request.urlopen(request, timeout=timeout)
+
+    def _call(self, method, *args):
+        body = json.dumps({"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": list(args)})
+        with self._request("/rpc", body.encode("utf-8")) as response:
+            reply = json.load(response)
+        if "error" in reply:
+            raise RuntimeError(reply["error"]["message"])
+        return reply["result"]
+
+    def set_window(self, window):
+        self.window = window
+        threading.Thread(target=self._forward_events, daemon=True).start()
+
+    def winget_search_stream(self, query, request_id, force=False):
+        return self._call("winget_search_stream", query, request_id, force, self._client)
+
+    def _forward_events(self):
+        after = None
+        while True:
+            try:
+                query = "" if after is None else f"?after={after}"
+                with self._request(f"/events{query}", timeout=DAEMON_HEARTBEAT_SECONDS * 2) as response:
+                    if after is None:
+                        after = int(response.headers.get("X-Event-Seq", 0))
+                    for line in response:
+                        if not line.strip():
+                            continue
+                        event = json.loads(line)
+                        after = event["seq"]
+                        if event["event"] == "onSearchResults" and event["args"][-1] != self._client:
+                            continue
+                        args = ", ".join(json.dumps(a) for a in event["args"])
+                        self.window.evaluate_js(f"{event['event']}({args})")
+            except (OSError, ValueError) as e:
+                print(f"Lost daemon event stream, reconnecting: {e}")
+                time.sleep(1)
+
+
+def _remote_method(name):
+    def call(self, *args):
+        return self._call(name, *args)
+    call.__name__ = name
+    return call
+
+
+for _name in RPC_METHODS:
+    if _name not in vars(RemoteApi):
+        setattr(RemoteApi, _name, _remote_method(_name))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Winget GUI")
+    parser.add_argument("--daemon", action="store_true", help="serve the Api over local JSON-RPC without a window")
+    parser.add_argument("--connect", action="store_true", help="open the window as a client of a running daemon")
+    parser.add_argument("--host", default=DAEMON_HOST)
+    parser.add_argument("--port", type=int, default=DAEMON_PORT)
+    options = parser.parse_args()
+    if options.daemon:
+        run_daemon(options.host, options.port)
+        raise SystemExit(0)
+
+    import webview
+
+    api = RemoteApi.from_discovery() if options.connect else Api()
     window = webview.create_window(
         "Winget GUI - Complete",
         html=html_code,
@@ -994,4 +4168,6 @@ if __name__ == "__main__":
         height=800,
     )
     api.set_window(window)
+    if not options.connect:
+        api.start_background_refresh()
     webview.start(debug=True)